@@ -25,7 +25,8 @@ class XMLFile(object):
         the file tree, and handle "conditional XML".
 
         :param filename: (str) The pathname to the XML file
-        :param xml_string: (str) text representation of XML to use instead of ``filename``
+        :param xml_string: (str, bytes, or mmap.mmap) text representation of XML to use
+           instead of ``filename``. A memory-mapped file is parsed without copying it.
         :param load: (bool) If True, the file is loaded, otherwise, the instance is
            set up, but the file is not read.
         :param schemaPath: (str) If not None, the path relative to the root of the
@@ -37,7 +38,7 @@ class XMLFile(object):
            when processing Conditional XML.
         """
         self.filename = filename
-        self.xml_string = str.encode(xml_string) if xml_string else None
+        self.xml_string = str.encode(xml_string) if isinstance(xml_string, str) else (xml_string or None)
         self.tree = None
         self.conditionalXML = conditionalXML
         self.varDict = varDict or getConfigDict(section=getParam('OPGEE.DefaultProject'))
@@ -70,7 +71,11 @@ class XMLFile(object):
         xml_string = self.xml_string
 
         if xml_string:
-            file_like = BytesIO(xml_string)
+            if isinstance(xml_string, bytes):
+                file_like = BytesIO(xml_string)
+            else:
+                file_like = xml_string  # memory-mapped file, which lxml reads as a file
+                file_like.seek(0)
             _logger.debug("Reading from XML string")
         else:
             file_like = self.filename
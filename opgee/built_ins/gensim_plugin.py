@@ -46,6 +46,9 @@ class GensimCommand(SubcommandABC):
         parser.add_argument('-s', '--simulation-dir',
                             help='''The top-level directory to create for this simulation "package"''')
 
+        parser.add_argument('--seed', type=int,
+                            help='''Seed for the random number generator, to make the trial data reproducible.''')
+
         parser.add_argument('-t', '--trials', type=int, default=0,
                             help='''The number of trials to create for this simulation (REQUIRED).''')
 
@@ -73,4 +76,5 @@ class GensimCommand(SubcommandABC):
         Simulation.new(sim_dir, model_files, analysis_name, args.trials,
                        field_names=args.fields,
                        overwrite=args.overwrite,
-                       use_default_model=use_default_model)
+                       use_default_model=use_default_model,
+                       seed=args.seed)
@@ -250,7 +250,8 @@ class RunManyCommand(SubcommandABC):
             df.sort_index(axis='rows', inplace=True)
 
             print(f"Writing '{csvpath}'")
-            df.to_csv(csvpath)
+            with open(csvpath, 'w', buffering=1 << 20, newline='') as fp:
+                df.to_csv(fp, lineterminator='\n', chunksize=100_000)
 
         def _save_errors(errors, csvpath):
             """Save a description of all field run errors"""
@@ -7,7 +7,7 @@
 # See LICENSE.txt for license details.
 #
 from .attributes import AttrDefs, AttributeMixin
-from .core import  ureg, XmlInstantiable
+from .core import XmlInstantiable
 from .emissions import Emissions
 from .energy import Energy
 from .error import OpgeeException
@@ -114,24 +114,33 @@ class Container(AttributeMixin, XmlInstantiable):
 
         return data
 
-    def get_emission_rates(self, analysis, procs_to_exclude=None):
+    def compute_emission_rates(self, analysis, procs_to_exclude=None):
         """
-        Return the emission rates (Series) including the calculated GHG values
-        based on the current choice of GWP values in the enclosing Model.
+        Sum the emission rates of our children into ``self.emissions`` and compute
+        the GHG values based on the current choice of GWP values in the enclosing Model.
 
-        :return: (pandas.Series) the emissions Series.
+        :return: none
         """
-        data = self.emissions.data
-        data[data.columns] = ureg.Quantity(0.0, 't/d')
+        emissions = self.emissions
+        emissions.reset()
 
         for child in self.children():
             if not procs_to_exclude or child not in procs_to_exclude:
-                    child_data = child.get_emission_rates(analysis, procs_to_exclude=procs_to_exclude)
-                    data += child_data
+                    child.compute_emission_rates(analysis, procs_to_exclude=procs_to_exclude)
+                    emissions.add_rates_from(child.emissions)
 
         # compute CO2eq using chosen GWP values
-        data = self.emissions.rates(analysis.gwp)
-        return data
+        emissions.compute_GHG(analysis.gwp)
+
+    def get_emission_rates(self, analysis, procs_to_exclude=None):
+        """
+        Return the emission rates (Series) including the calculated GHG values
+        based on the current choice of GWP values in the enclosing Model.
+
+        :return: (pandas.Series) the emissions Series.
+        """
+        self.compute_emission_rates(analysis, procs_to_exclude=procs_to_exclude)
+        return self.emissions.data
 
     def get_net_imported_product(self):
         """
@@ -50,7 +50,22 @@ def elt_name(elt):
     return elt.attrib.get('name')
 
 
-def instantiate_subelts(elt, cls, parent=None, as_dict=False, include_names=None):
+def subelts_by_tag(elt):
+    """
+    Group the immediate subelements of ``elt`` by tag in a single pass, so callers
+    instantiating several kinds of subelement needn't search ``elt`` once per kind.
+
+    :param elt: (lxml.etree.Element) the parent element
+    :return: (dict) lists of subelements, in document order, keyed by tag
+    """
+    d = {}
+    for child in elt:
+        d.setdefault(child.tag, []).append(child)
+
+    return d
+
+
+def instantiate_subelts(elt, cls, parent=None, as_dict=False, include_names=None, by_tag=None):
     """
     Return a list of instances of ``cls`` (or of its indicated subclass of ``Process``).
 
@@ -63,12 +78,15 @@ def instantiate_subelts(elt, cls, parent=None, as_dict=False, include_names=None
        attrib dict must have a "name" item, whose value is compared to the list). If
        ``include_names`` is not None, then elements with names not in the list are
        ignored.
+    :param by_tag: (dict) the result of ``subelts_by_tag(elt)``, if the caller has
+       already computed it; otherwise ``elt`` is searched for subelements.
     :return: (list) instantiated objects
     """
     tag = cls.__name__  # class name matches element name
+    subelts = elt.findall(tag) if by_tag is None else by_tag.get(tag, ())
 
     include = None if include_names is None else set(include_names)
-    objs = [cls.from_xml(e, parent=parent) for e in elt.findall(tag) if include is None or e.attrib.get('name') in include]
+    objs = [cls.from_xml(e, parent=parent) for e in subelts if include is None or e.attrib.get('name') in include]
 
     if as_dict:
         d = {obj.name: obj for obj in objs}
@@ -120,6 +138,9 @@ def split_attr_name(attr_name):
 
 # Top of hierarchy, because it's useful to know which classes are "ours"
 class OpgeeObject():
+    # Empty so subclasses that define __slots__ (e.g., TemperaturePressure) don't get a __dict__
+    __slots__ = ()
+
     @classmethod
     def clear(cls):
         # Clear state stored in class variables
@@ -6,11 +6,13 @@
 # Copyright (c) 2021-2022 The Board of Trustees of the Leland Stanford Junior University.
 # See LICENSE.txt for license details.
 #
+import numpy as np
 import pandas as pd
 import pint
+import pint_pandas
 
 from . import ureg
-from .core import OpgeeObject, magnitude
+from .core import OpgeeObject
 from .error import OpgeeException
 from .log import getLogger
 from .stream import Stream
@@ -41,8 +43,11 @@ class EmissionsError(OpgeeException):
 
 class Emissions(OpgeeObject):
     """
-    Emissions is an object wrapper around a pandas.Series holding emission flow
-    rates for a pre-defined set of substances, defined in ``Emissions.emissions``.
+    Emissions holds emission flow rates for a pre-defined set of substances, defined
+    in ``Emissions.emissions``, by emissions category. Rates are stored as a NumPy
+    array of magnitudes in ``Emissions.units()``, with rows in the order of
+    ``Emissions.indices`` and columns in the order of ``Emissions.categories``. The
+    ``data`` property presents the rates as a pint-typed pandas.DataFrame.
     """
 
     #: `Emissions.emissions` defines the set of substances tracked by this class.
@@ -58,7 +63,15 @@ class Emissions(OpgeeObject):
     categories = [EM_COMBUSTION, EM_LAND_USE, EM_VENTING, EM_FLARING, EM_FUGITIVES, EM_OTHER]
     _categories_set = set(categories)
 
+    # Row and column positions in the rates array
+    _index_pos = {name: i for i, name in enumerate(indices)}
+    _category_pos = {name: i for i, name in enumerate(categories)}
+    _GHG_ROW = _index_pos['GHG']
+    _num_emissions = len(emissions)     # the rows other than GHG
+    _emissions_index = pd.Index(emissions)
+
     _units = ureg.Unit("tonne/day")
+    _dtype = pint_pandas.PintType(_units)
 
     @classmethod
     def create_emissions_matrix(cls):
@@ -70,17 +83,27 @@ class Emissions(OpgeeObject):
         return pd.DataFrame(data=0.0, index=cls.indices, columns=cls.categories, dtype="pint[tonne/day]")
 
     def __init__(self):
-        self.data = self.create_emissions_matrix()
+        self.array = np.zeros((len(self.indices), len(self.categories)), dtype=np.float64)
+
+    @property
+    def data(self):
+        """
+        The emission rates as a pandas.DataFrame with ``Emissions.indices`` as the index,
+        ``Emissions.categories`` as the columns, and units of ``Emissions.units()``. The
+        DataFrame is constructed on each access, so modifying it doesn't affect the
+        stored rates; use the ``set_*`` and ``add_*`` methods or ``array`` instead.
+        """
+        dtype = self._dtype
+        columns = {category: pint_pandas.PintArray(self.array[:, i].copy(), dtype=dtype)
+                   for i, category in enumerate(self.categories)}
+        return pd.DataFrame(columns, index=self.indices)
 
     @classmethod
     def units(cls):
         return cls._units
 
     def reset(self):
-        # Note: neither self.data[:] = 0.0 nor self.data.loc[:, :] = 0.0 work properly: these
-        # reset the dtype to float, losing the pint units. The expression below works as we'd like.
-        # self.data.loc[self.data.index, :] = 0.0
-        self.data[self.data.index] = 0.0
+        self.array[:] = 0.0
 
     def rates(self, gwp=None):
         """
@@ -106,8 +129,24 @@ class Emissions(OpgeeObject):
             same index as self.data (i.e., Emissions.emissions)
         :return: none
         """
-        product = self.data.T[self.emissions] * gwp
-        self.data.loc['GHG'] = product.sum(axis='columns')
+        # Analysis.use_GWP() already orders the GWPs like Emissions.emissions, so
+        # the (relatively) costly reindex is usually unnecessary.
+        if not gwp.index.equals(self._emissions_index):
+            gwp = gwp.reindex(self.emissions)
+
+        gwp = gwp.to_numpy(dtype=np.float64)
+        arr = self.array
+        arr[self._GHG_ROW] = gwp @ arr[:self._num_emissions]
+
+    def ghg_magnitudes(self):
+        """
+        Return the GHG emissions by category, as computed by the most recent call to
+        ``compute_GHG`` or ``rates``.
+
+        :return: (numpy.ndarray) GHG emission rates in ``Emissions.units()``, in the
+            order of ``Emissions.categories``. This is a view of the stored rates.
+        """
+        return self.array[self._GHG_ROW]
 
     def reset_GHG(self):
         """
@@ -115,7 +154,7 @@ class Emissions(OpgeeObject):
 
         :return: none
         """
-        self.data.loc['GHG'] = 0.0
+        self.array[self._GHG_ROW] = 0.0
 
     def _check_loc(self, func_name, gas, category):
         if category not in self._categories_set or gas not in self._emissions_set:
@@ -130,9 +169,9 @@ class Emissions(OpgeeObject):
         :param rate: (float) the rate in the Process' flow units (e.g., mmbtu (LHV) of fuel burned)
         :return: none
         """
-        rate = rate.to("tonne/day") if isinstance(rate, pint.Quantity) else rate
         self._check_loc('set_rate', gas, category)
-        self.data.loc[gas, category] = magnitude(rate, units="tonne/day")
+        rate = rate.m_as(self._units) if isinstance(rate, pint.Quantity) else rate
+        self.array[self._index_pos[gas], self._category_pos[category]] = rate
 
     def set_rates(self, category, **kwargs):
         """
@@ -156,8 +195,8 @@ class Emissions(OpgeeObject):
         :return: none
         """
         self._check_loc('add_rate', gas, category)
-        sum = self.data.loc[gas, category] + rate
-        self.data.loc[gas, category] = magnitude(sum, units="tonne/day")
+        rate = rate.m_as(self._units) if isinstance(rate, pint.Quantity) else rate
+        self.array[self._index_pos[gas], self._category_pos[category]] += rate
 
     def add_rates(self, category, **kwargs):
         """
@@ -253,4 +292,4 @@ class Emissions(OpgeeObject):
         :param emissions:
         :return:
         """
-        self.data += emissions.data
+        self.array += emissions.array
@@ -79,6 +79,9 @@ class Field(Container):
         self.carbon_intensity = ureg.Quantity(0.0, "g/MJ")
         self.procs_beyond_boundary = None
 
+        # Boundary energy flow rates computed since the last reset(), keyed by analysis name
+        self._boundary_energy_cache = {}
+
         self.graph = None
         self.cycles = None
 
@@ -351,12 +354,13 @@ class Field(Container):
             # Perform aggregations
             self.get_energy_rates()
 
-            self.get_emission_rates(analysis, procs_to_exclude=self.procs_beyond_boundary)
+            self.compute_emission_rates(analysis, procs_to_exclude=self.procs_beyond_boundary)
             self.carbon_intensity = self.compute_carbon_intensity(analysis) if compute_ci else None
             _logger.info(timer.stop())
 
 
     def reset(self):
+        self._boundary_energy_cache.clear()
         self.reset_streams()
         self.reset_processes()
 
@@ -416,12 +420,18 @@ class Field(Container):
         :return: (pint.Quantity) the energy flow at the boundary
         """
         boundary_proc = self.boundary_process(analysis)
-        stream = boundary_proc.sum_input_streams()
 
-        # TODO: displacement method
-        obj = self.oil if analysis.fn_unit == 'oil' else self.gas
-        # TODO: Add method to calculate petrocoke energy flow rate
-        energy = obj.energy_flow_rate(stream)
+        # The result depends only on the state of the streams, which changes only
+        # when the field is run, so it's computed at most once per run and analysis.
+        energy = self._boundary_energy_cache.get(analysis.name)
+        if energy is None:
+            stream = boundary_proc.sum_input_streams()
+
+            # TODO: displacement method
+            obj = self.oil if analysis.fn_unit == 'oil' else self.gas
+            # TODO: Add method to calculate petrocoke energy flow rate
+            energy = obj.energy_flow_rate(stream)
+            self._boundary_energy_cache[analysis.name] = energy
 
         if energy.m == 0:
             if raiseError:
@@ -440,8 +450,9 @@ class Field(Container):
         :param analysis: (Analysis) the analysis this field is part of
         :return: (pint.Quantity) carbon intensity in units of g CO2e/MJ
         """
-        rates = self.emissions.rates(analysis.gwp)
-        onsite_emissions = rates.loc['GHG'].sum()
+        emissions = self.emissions
+        emissions.compute_GHG(analysis.gwp)
+        onsite_emissions = ureg.Quantity(emissions.ghg_magnitudes().sum(), emissions.units())
         net_import = self.get_net_imported_product()
         imported_emissions = self.get_imported_emissions(net_import)
         total_emissions = onsite_emissions + imported_emissions
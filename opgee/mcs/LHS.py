@@ -16,6 +16,7 @@
 #
 import numpy as np
 from scipy import stats
+from scipy.stats import qmc
 from pandas import DataFrame
 
 from ..log import getLogger
@@ -91,19 +92,21 @@ def getPercentiles(trials=100):
     Generate a list of 'trials' values, one from each of 'trials' equal-size
     segments from a uniform distribution. These are used with an RV's ppf
     (percent point function = inverse cumulative function) to retrieve the
-    values for that RV at the corresponding percentiles.
+    values for that RV at the corresponding percentiles. Used by lhsAmend().
     '''
     segmentSize = float(1. / trials)
     points = stats.uniform.rvs(size=trials) * segmentSize + np.arange(trials) * segmentSize  # @UndefinedVariable
     return points
 
 
-def lhs(paramList, trials, corrMat=None, columns=None, skip=None):
+def lhs(paramList, trials, corrMat=None, columns=None, skip=None, seed=None):
     """
     Produce an ndarray or DataFrame of 'trials' rows of values for the given parameter
     list, respecting the correlation matrix 'corrMat' if one is specified, using Latin
     Hypercube (stratified) sampling.
 
+    The stratified percentiles for all parameters are generated in one call to
+    scipy.stats.qmc.LatinHypercube, which randomly pairs the strata across columns.
     The values in the i'th column are drawn from the ppf function of the i'th parameter
     from paramList, and each columns i and j are rank correlated according to corrMat[i,j].
 
@@ -117,11 +120,29 @@ def lhs(paramList, trials, corrMat=None, columns=None, skip=None):
     :param skip: (list of params)) Parameters to process later because they are
            dependent on other parameter values (e.g., they're "linked"). These
            cannot be correlated.
+    :param seed: (None, int, or numpy.random.Generator) seed for the random number
+           generator, passed to scipy.stats.qmc.LatinHypercube. If None, a seed is
+           drawn from numpy's global random state, so ``np.random.seed()`` makes
+           the results reproducible.
     :return: ndarray or DataFrame with `trials` rows of values for the `paramList`.
     """
-    ranks = genRankValues(len(paramList), trials, corrMat) if corrMat is not None else None
+    count = len(paramList)
+    samples = np.zeros((trials, count))  # @UndefinedVariable
 
-    samples = np.zeros((trials, len(paramList)))  # @UndefinedVariable
+    if count == 0:
+        return DataFrame(samples, columns=columns) if columns else samples
+
+    if seed is None:
+        seed = np.random.randint(2**32, dtype=np.int64)
+
+    # Each column holds one value from each of 'trials' equal-size strata, in random order
+    percentiles = qmc.LatinHypercube(d=count, seed=seed).random(n=trials)
+
+    if corrMat is not None:
+        # Reorder each column to respect the rank correlations
+        ranks = genRankValues(count, trials, corrMat)
+        percentiles.sort(axis=0)
+        percentiles = np.take_along_axis(percentiles, ranks - 1, axis=0)  # make ranks 0-relative
 
     skip = skip or []
 
@@ -129,20 +150,7 @@ def lhs(paramList, trials, corrMat=None, columns=None, skip=None):
         if param in skip:
             continue    # process later
 
-        values = param.ppf(getPercentiles(trials))  # extract values from the RV for these percentiles
-
-        if corrMat is None:
-            # # Sequence is a special case for which we don't shuffle (and we ignore stratified sampling)
-            # if param.param.dataSrc.distroName != 'sequence':
-            #     np.random.shuffle(values)  # randomize the stratified samples
-
-            # Skip the Sequence stuff for now
-            np.random.shuffle(values)  # randomize the stratified samples
-        else:
-            indices = ranks[:, i] - 1  # make them 0-relative
-            values = values[indices]   # reorder to respect correlations
-
-        samples[:, i] = values
+        samples[:, i] = param.ppf(percentiles[:, i])  # extract values from the RV for these percentiles
 
     return DataFrame(samples, columns=columns) if columns else samples
 
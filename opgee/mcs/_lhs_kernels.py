@@ -0,0 +1,165 @@
+#
+# Numba-compiled inverse CDFs (ppf functions) for the normal and lognormal distributions
+# and their truncated variants, which account for most of the sampling work performed
+# by Simulation.generate(). Numba is optional: if it isn't installed, ppf_kernel()
+# returns None and callers use the scipy.stats ppf functions instead.
+#
+# Copyright (c) 2022 the author and The Board of Trustees of the Leland Stanford Junior University.
+# See LICENSE.txt for license details.
+#
+import math
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+# Coefficients of Acklam's rational approximation of the inverse standard normal CDF
+_A = (-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02,
+      1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00)
+_B = (-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02,
+      6.680131188771972e+01, -1.328068155288572e+01)
+_C = (-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00,
+      -2.549732539343734e+00, 4.374664141464968e+00, 2.938163982698783e+00)
+_D = (7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00,
+      3.754408661907416e+00)
+
+_P_LOW = 0.02425
+
+# Below this probability mass, a truncated normal is left to scipy, which works in log space
+_MIN_TRUNCNORM_MASS = 1e-300
+_SQRT2 = math.sqrt(2.0)
+_SQRT2PI = math.sqrt(2.0 * math.pi)
+
+
+def _ndtr(x):
+    """Standard normal CDF"""
+    return 0.5 * math.erfc(-x / _SQRT2)
+
+def _ndtri_lower(p):
+    """
+    Inverse of the standard normal CDF for 0 < p <= 0.5, using Acklam's
+    approximation (relative error < 1.2e-9) followed by one step of Halley's
+    method. Restricting the refinement to the lower half keeps the residual
+    ``_ndtr(x) - p`` accurate relative to ``p``, so the result has a relative
+    error of about 1e-15 even far into the tail (the absolute error near the
+    median is about 1e-16).
+    """
+    if p <= 0.0:
+        return -math.inf
+
+    if p < _P_LOW:
+        q = math.sqrt(-2.0 * math.log(p))
+        x = ((((((_C[0] * q + _C[1]) * q + _C[2]) * q + _C[3]) * q + _C[4]) * q + _C[5]) /
+             ((((_D[0] * q + _D[1]) * q + _D[2]) * q + _D[3]) * q + 1.0))
+    else:
+        q = p - 0.5
+        r = q * q
+        x = ((((((_A[0] * r + _A[1]) * r + _A[2]) * r + _A[3]) * r + _A[4]) * r + _A[5]) * q /
+             (((((_B[0] * r + _B[1]) * r + _B[2]) * r + _B[3]) * r + _B[4]) * r + 1.0))
+
+    # Halley refinement
+    e = _ndtr(x) - p
+    u = e * _SQRT2PI * math.exp(0.5 * x * x)
+    return x - u / (1.0 + 0.5 * x * u)
+
+def _ndtri(p):
+    """Inverse of the standard normal CDF"""
+    if p >= 1.0:
+        return math.inf
+
+    # 1 - p is exact for p in [0.5, 1], so use symmetry to stay in the lower tail
+    return _ndtri_lower(p) if p <= 0.5 else -_ndtri_lower(1.0 - p)
+
+def _normal_ppf(u, loc, scale, out):
+    for i in prange(u.shape[0]):
+        out[i] = loc + scale * _ndtri(u[i])
+
+def _truncnorm_mass(a, b):
+    """Probability mass of the standard normal between a and b"""
+    return _ndtr(-a) - _ndtr(-b) if a > 0.0 else _ndtr(b) - _ndtr(a)
+
+def _truncnorm_ppf(u, a, b, loc, scale, out):
+    # a and b are the bounds of the standard normal, as in scipy.stats.truncnorm.
+    # Interpolate in CDF space in the lower half of the distribution and in survival
+    # function space in the upper half, where the probabilities are small and therefore
+    # represented accurately. Both forms add non-negative terms, so no precision is
+    # lost to cancellation.
+    p_a = _ndtr(a)
+    s_b = _ndtr(-b)
+    mass = _truncnorm_mass(a, b)
+    for i in prange(u.shape[0]):
+        p = p_a + u[i] * mass
+        if a <= 0.0 and p <= 0.5:
+            x = _ndtri(p)
+        else:
+            x = -_ndtri(s_b + (1.0 - u[i]) * mass)
+        out[i] = loc + scale * min(max(x, a), b)
+
+def _lognormal_ppf(u, s, scale, out):
+    # s and scale are the parameters of scipy.stats.lognorm, i.e., sigma and exp(mu)
+    for i in prange(u.shape[0]):
+        out[i] = scale * math.exp(s * _ndtri(u[i]))
+
+def _clipped_lognormal_ppf(u, s, scale, low, high, out):
+    # Values outside [low, high] are set to the bound, as in distro.truncated_lognormal
+    for i in prange(u.shape[0]):
+        out[i] = min(max(scale * math.exp(s * _ndtri(u[i])), low), high)
+
+
+_kernels = None
+
+if njit is not None:
+    _ndtr = njit(cache=True)(_ndtr)
+    _ndtri_lower = njit(cache=True)(_ndtri_lower)
+    _ndtri = njit(cache=True)(_ndtri)
+    _truncnorm_mass = njit(cache=True)(_truncnorm_mass)
+
+    _kernels = {
+        'norm'               : njit(parallel=True, cache=True)(_normal_ppf),
+        'truncnorm'          : njit(parallel=True, cache=True)(_truncnorm_ppf),
+        'lognorm'            : njit(parallel=True, cache=True)(_lognormal_ppf),
+        'truncated_lognormal': njit(parallel=True, cache=True)(_clipped_lognormal_ppf),
+    }
+
+# Order of the keyword parameters passed to each kernel, following the array of percentiles
+_kernel_args = {
+    'norm'               : ('loc', 'scale'),
+    'truncnorm'          : ('a', 'b', 'loc', 'scale'),
+    'lognorm'            : ('s', 'scale'),
+    'truncated_lognormal': ('s', 'scale', 'low', 'high'),
+}
+
+
+def ppf_kernel(dist_name):
+    """
+    Return a function with the signature of ``scipy.stats.<dist_name>.ppf`` (i.e., taking
+    array-like percentiles and the distribution's parameters as keyword arguments) that
+    calls a compiled kernel.
+
+    :param dist_name: (str) the name of a ``scipy.stats`` distribution, or
+       "truncated_lognormal" for a lognormal with values clipped to [low, high].
+    :return: (function or None) the ppf function, or None if numba isn't installed
+       or there is no kernel for ``dist_name``.
+    """
+    if _kernels is None or dist_name not in _kernels:
+        return None
+
+    kernel = _kernels[dist_name]
+    arg_names = _kernel_args[dist_name]
+
+    def ppf(q, **params):
+        args = [float(params[name]) for name in arg_names]
+
+        if dist_name == 'truncnorm' and _truncnorm_mass(args[0], args[1]) < _MIN_TRUNCNORM_MASS:
+            from scipy import stats
+            return stats.truncnorm.ppf(q, **params)
+
+        shape = np.shape(q)
+        q = np.ascontiguousarray(q, dtype=np.float64).ravel()
+        out = np.empty_like(q)
+        kernel(q, *args, out)
+        return out.reshape(shape)
+
+    return ppf
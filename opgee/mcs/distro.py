@@ -19,6 +19,7 @@ from scipy.stats import lognorm, triang, uniform, norm, rv_discrete, truncnorm
 from ..error import OpgeeException, DistributionSpecError, McsUserError
 from ..log import getLogger
 from ..pkg_utils import resourceStream
+from ._lhs_kernels import ppf_kernel
 
 _logger = getLogger(__name__)
 
@@ -82,14 +83,22 @@ def lognormalRvForNormal(mu, sigma):
     '''
     return lognorm(sigma, scale=math.exp(mu))
 
-def lognormalRv(logMean, logStd):
+def lognormalParams(logMean, logStd):
     '''
-    Define a lognormal RV by its own mean and stdev
+    Return the mean and stdev (mu, sigma) of the Normal distribution underlying
+    a lognormal with the given mean and stdev
     '''
     logVar = float(logStd) ** 2
     mSqrd = float(logMean) ** 2
     mu = math.log(mSqrd / math.sqrt(logVar + mSqrd))
     sigma = math.sqrt(math.log(logVar / mSqrd + 1))
+    return mu, sigma
+
+def lognormalRv(logMean, logStd):
+    '''
+    Define a lognormal RV by its own mean and stdev
+    '''
+    mu, sigma = lognormalParams(logMean, logStd)
     return lognormalRvForNormal(mu, sigma)
 
 # TBD: poorly documented... is this the 95% CI (2.5% to 97.5%?) or the 90% CI (5% to 95%)?
@@ -134,7 +143,14 @@ class truncated_lognormal():
 
         self.rv = lognormalRv(logmean, logstdev)
 
+        mu, sigma = lognormalParams(logmean, logstdev)
+        self._kernel_params = dict(s=sigma, scale=math.exp(mu), low=low, high=high)
+        self._kernel = ppf_kernel('truncated_lognormal')   # None if numba isn't installed
+
     def ppf(self, q):
+        if self._kernel:
+            return self._kernel(q, **self._kernel_params)
+
         y = self.rv.ppf(q)
 
         # simple truncation of values below low to low, above high to high
@@ -143,7 +159,11 @@ class truncated_lognormal():
 
         return y
 
-def triangle(min, mode, max):  # @ReservedAssignment
+def triangleParams(min, mode, max):  # @ReservedAssignment
+    '''
+    Return the parameters (c, loc, scale) of scipy's triang distribution
+    for a triangle with the given min, mode, and max.
+    '''
     # correct ordering if necessary
     if min > max:
         tmp = min
@@ -155,7 +175,11 @@ def triangle(min, mode, max):  # @ReservedAssignment
         raise OpgeeException("Scale of triangle distribution is zero")
 
     c = (mode - min) / scale  # central value (mode) of the triangle
-    return triang(c, loc=min, scale=scale)
+    return c, min, scale
+
+def triangle(min, mode, max):  # @ReservedAssignment
+    c, loc, scale = triangleParams(min, mode, max)
+    return triang(c, loc=loc, scale=scale)
 
 def triangleRange(range):
     if range <= 0.0:
@@ -439,3 +463,44 @@ def get_frozen_rv(distro_name, **kwargs):
 
     rv = gen.makeRV(kwargs)  # generate a frozen RV with the specified arguments
     return rv
+
+def _triangle_params(min, mode, max):
+    c, loc, scale = triangleParams(min, mode, max)
+    return 'triang', dict(c=c, loc=loc, scale=scale)
+
+def _lognormal_params(logmean, logstdev):
+    mu, sigma = lognormalParams(logmean, logstdev)
+    return 'lognorm', dict(s=sigma, scale=math.exp(mu))
+
+# Functions returning the name of a scipy.stats distribution and the parameters that
+# produce the same results as the frozen RV created by get_frozen_rv().
+_rv_params_funcs = {
+    'weighted_binary'  : lambda prob_of_one: ('bernoulli', dict(p=prob_of_one)),
+    'uniform'          : lambda min, max: ('uniform', dict(loc=min, scale=(max - min))),
+    'triangle'         : _triangle_params,
+    'normal'           : lambda mean, stdev: ('norm', dict(loc=mean, scale=stdev)),
+    'truncated_normal' : lambda mean, stdev, low, high: ('truncnorm', dict(a=(low - mean) / stdev,
+                                                                           b=(high - mean) / stdev,
+                                                                           loc=mean, scale=stdev)),
+    'lognormal'        : _lognormal_params,
+}
+
+def get_rv_params(distro_name, **kwargs):
+    """
+    Return the name of a ``scipy.stats`` distribution and a dict of its parameters
+    equivalent to ``get_frozen_rv(distro_name, **kwargs)``. Instantiating frozen
+    distributions is expensive, so callers can instead pass these parameters to the
+    distribution's ``ppf`` and ``rvs`` methods.
+
+    :param distro_name: (str) one of 'weighted_binary', 'uniform', 'triangle',
+        'normal', 'truncated_normal', or 'lognormal'
+    :param kwargs: (dict) the keyword arguments accepted by the corresponding
+        function called by ``get_frozen_rv``.
+    :return: (tuple of (str, dict)) the scipy.stats distribution name and parameters
+    :raises: DistributionSpecError if the distribution isn't supported
+    """
+    func = _rv_params_funcs.get(distro_name)
+    if func is None:
+        raise DistributionSpecError(f"Parameters are not available for distribution '{distro_name}'")
+
+    return func(**kwargs)
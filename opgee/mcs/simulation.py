@@ -6,127 +6,254 @@
 # Copyright (c) 2022 the author and The Board of Trustees of the Leland Stanford Junior University.
 # See LICENSE.txt for license details.
 #
+import csv
 import json
+import mmap
 import os
+import numpy as np
 import pandas as pd
+import pickle
+import scipy.stats
 import traceback
+from itertools import islice, repeat
 
-from ..config import pathjoin
+from ..attributes import AttrDefs
+from ..config import pathjoin, getParam, getParamAsInt
 from ..core import OpgeeObject, split_attr_name, Timer
+from ..emissions import (Emissions, EM_COMBUSTION, EM_LAND_USE, EM_VENTING,
+                         EM_FLARING, EM_FUGITIVES, EM_OTHER)
 from ..error import OpgeeException, McsSystemError, McsUserError, CommandlineError
 from ..log import getLogger
 from ..model_file import ModelFile
 from ..pkg_utils import resourceStream
-from ..utils import mkdirs, removeTree
+from ..table_manager import TableManager
+from ..utils import mkdirs, removeTree, code_signature
 from .LHS import lhs
-from .distro import get_frozen_rv
+from ._lhs_kernels import ppf_kernel
+from .distro import get_frozen_rv, get_rv_params
+
+# orjson is faster and reads/writes bytes directly; fall back to the standard library if absent.
+try:
+    import orjson
+
+    def _json_dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+
+    _json_loads = orjson.loads
+
+except ImportError:
+    def _json_dumps(obj):
+        return json.dumps(obj, indent=2).encode('utf-8')
+
+    _json_loads = json.loads
+
+# pyarrow is optional; if present, results are also saved incrementally to a Parquet file.
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
 
 _logger = getLogger(__name__)
 
 
 TRIAL_DATA_CSV = 'trial_data.csv'
 RESULTS_CSV = 'results.csv'
+RESULTS_PARQUET = 'results.parquet'
 FAILURES_CSV = 'failures.csv'
 MODEL_FILE = 'merged_model.xml'
+MODEL_PICKLE = 'model.pkl'
 META_DATA_FILE = 'metadata.json'
 
 DISTROS_CSV = 'mcs/etc/parameter_distributions.csv'
 
 DEFAULT_DIGITS = 3
 
-def magnitude(quantity, digits=DEFAULT_DIGITS):          # pragma: no cover
-    return round(quantity.m, digits)
+# Number of rows of TRIAL_DATA_CSV read at a time by Simulation.iter_trial_data()
+TRIAL_DATA_CHUNK = 1024
+
+# Columns of RESULTS_CSV, following the 'trial_num' column
+RESULT_COLS = ['CI',
+               'total_GHG',
+               'combustion',
+               'land_use',
+               'VFF',
+               'other']
+
+# Positions of emissions categories in the columns of Emissions.array
+(_COMBUSTION, _LAND_USE, _VENTING,
+ _FLARING, _FUGITIVES, _OTHER) = [Emissions.categories.index(name) for name in
+                                  (EM_COMBUSTION, EM_LAND_USE, EM_VENTING,
+                                   EM_FLARING, EM_FUGITIVES, EM_OTHER)]
 
 def model_file_path(sim_dir):     # pragma: no cover
     model_file = pathjoin(sim_dir, MODEL_FILE)
     return model_file
 
-def read_distributions(pathname=None):
-    """
-    Read distributions from the designated CSV file. These are combined with those defined
-    using the @Distribution.register() decorator, used to define distributions with dependencies.
+# The Simulation instance used by each worker process when running trials in parallel.
+# Set by _init_trial_worker(), which is called once when each worker process starts.
+_worker_sim = None
 
-    :param pathname: (str) the pathname of the CSV file describing parameter distributions
-    :return: (none)
-    """
-    distros_csv = pathname or resourceStream(DISTROS_CSV, stream_type='bytes', decode=None)
+def _init_trial_worker(sim_dir, field_name):     # pragma: no cover
+    global _worker_sim
+    _worker_sim = Simulation(sim_dir, field_names=[field_name], save_to_path='')
 
-    df = pd.read_csv(distros_csv, skip_blank_lines=True, comment='#').fillna('')
+def _run_one_trial(field_name, trial_num, names, values):       # pragma: no cover
+    return _worker_sim.run_trial_safely(field_name, trial_num, row=(names, values))
 
-    for row in df.itertuples(index=False, name='row'):
-        shape = row.distribution_type.lower()
-        name = row.variable_name
-        low = row.low_bound
-        high = row.high_bound
-        mean = row.mean
-        stdev = row.SD
-        default = row.default_value
-        prob_of_yes = row.prob_of_yes
-        pathname = row.pathname
+def _binary_rv(row):
+    prob_of_yes = row['prob_of_yes']
+    if prob_of_yes == 0 or prob_of_yes == 1:
+        _logger.info(f"* Ignoring distribution on {row['variable_name']}, Binary distribution has prob_of_yes = {prob_of_yes}")
+        return None
 
-        if name == '':
-            continue
+    return get_rv_params('weighted_binary', prob_of_one=0.5 if prob_of_yes is None else prob_of_yes)
 
-        if low == '' and high == '' and mean == '' and prob_of_yes == '' and shape != 'empirical':
-            _logger.info(f"* {name} depends on other distributions / smart defaults")        # TODO add in lookup of attribute value
-            continue
+def _uniform_rv(row):
+    low = row['low_bound']
+    high = row['high_bound']
+    if low == high:
+        _logger.info(f"* Ignoring distribution on {row['variable_name']}, Uniform high and low bounds are both {low}")
+        return None
 
-        if shape == 'binary':
-            if prob_of_yes == 0 or prob_of_yes == 1:
-                _logger.info(f"* Ignoring distribution on {name}, Binary distribution has prob_of_yes = {prob_of_yes}")
-                continue
+    return get_rv_params('uniform', min=low, max=high)
 
-            rv = get_frozen_rv('weighted_binary', prob_of_one=0.5 if prob_of_yes == '' else prob_of_yes)
+def _triangular_rv(row):
+    low = row['low_bound']
+    high = row['high_bound']
+    if low == high:
+        _logger.info(f"* Ignoring distribution on {row['variable_name']}, Triangle high and low bounds are both {low}")
+        return None
 
-        elif shape == 'uniform':
-            if low == high:
-                _logger.info(f"* Ignoring distribution on {name}, Uniform high and low bounds are both {low}")
-                continue
+    return get_rv_params('triangle', min=low, mode=row['default_value'], max=high)
 
-            rv = get_frozen_rv('uniform', min=low, max=high)
+def _normal_rv(row):
+    mean = row['mean']
+    stdev = row['SD']
+    low = row['low_bound']
+    high = row['high_bound']
 
-        elif shape == 'triangular':
-            if low == high:
-                _logger.info(f"* Ignoring distribution on {name}, Triangle high and low bounds are both {low}")
-                continue
+    if stdev == 0.0:
+        _logger.info(f"* Ignoring distribution on {row['variable_name']}, Normal has stdev = 0")
+        return None
 
-            rv = get_frozen_rv('triangle', min=low, mode=default, max=high)
+    if low is None or high is None:
+        return get_rv_params('normal', mean=mean, stdev=stdev)
 
-        elif shape == 'normal':
-            if stdev == 0.0:
-                _logger.info(f"* Ignoring distribution on {name}, Normal has stdev = 0")
-                continue
+    return get_rv_params('truncated_normal', mean=mean, stdev=stdev, low=low, high=high)
 
-            if low == '' or high == '':
-                rv = get_frozen_rv('normal', mean=mean, stdev=stdev)
-            else:
-                rv = get_frozen_rv('truncated_normal', mean=mean, stdev=stdev, low=low, high=high)
+def _lognormal_rv(row):
+    mean = row['mean']
+    stdev = row['SD']
+    low = row['low_bound']
+    high = row['high_bound']
 
-        elif shape == 'lognormal':
-            if stdev == 0.0:
-                _logger.info(f"* Ignoring distribution on {name}, Lognormal has stdev = 0")
-                continue
+    if stdev == 0.0:
+        _logger.info(f"* Ignoring distribution on {row['variable_name']}, Lognormal has stdev = 0")
+        return None
 
-            if low == '' or high == '':     # must specify both low and high
-                rv = get_frozen_rv('lognormal', logmean=mean, logstdev=stdev)
-            else:
-                rv = get_frozen_rv('truncated_lognormal', logmean=mean, logstdev=stdev, low=low, high=high)
+    if low is None or high is None:     # must specify both low and high
+        return get_rv_params('lognormal', logmean=mean, logstdev=stdev)
 
-        elif shape == 'empirical':
-            rv = get_frozen_rv('empirical', pathname=pathname, colname=name)
+    return get_frozen_rv('truncated_lognormal', logmean=mean, logstdev=stdev, low=low, high=high)
 
-        else:
+def _empirical_rv(row):
+    return get_frozen_rv('empirical', pathname=row['pathname'], colname=row['variable_name'])
+
+# Maps the (lowercase) distribution_type in the distributions CSV file to a function that
+# takes a row (as a dict) and returns either a (scipy.stats distribution name, parameters)
+# tuple or an RV-like object with a ppf method, or None if the row is ignored.
+_SHAPE_HANDLERS = {
+    'binary'     : _binary_rv,
+    'uniform'    : _uniform_rv,
+    'triangular' : _triangular_rv,
+    'normal'     : _normal_rv,
+    'lognormal'  : _lognormal_rv,
+    'empirical'  : _empirical_rv,
+}
+
+_NUMERIC_COLS = ['mean', 'SD', 'low_bound', 'high_bound', 'prob_of_yes', 'default_value']
+
+def _to_float(value):
+    """
+    Convert a CSV cell to float, returning None for empty or non-numeric values.
+    """
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def _read_distribution_rows(pathname):
+    """
+    Read the distributions CSV file, skipping blank and comment lines.
+
+    :param pathname: (str, file-like, or None) the pathname of the CSV file, an open
+        text stream, or None to read the built-in file.
+    :return: (list of dict) the rows of the file, keyed by column name
+    """
+    if pathname is None:
+        lines = resourceStream(DISTROS_CSV, decode='utf-8-sig').readlines()
+    elif isinstance(pathname, str):
+        with open(pathname, newline='', encoding='utf-8-sig') as f:
+            lines = f.readlines()
+    else:
+        lines = pathname.readlines()
+
+    reader = csv.DictReader((line for line in lines if line.strip() and not line.lstrip().startswith('#')),
+                            restval='')
+    return list(reader)
+
+def read_distributions(pathname=None):
+    """
+    Read distributions from the designated CSV file. These are combined with those defined
+    using the @Distribution.register() decorator, used to define distributions with dependencies.
+
+    :param pathname: (str) the pathname of the CSV file describing parameter distributions
+    :return: (none)
+    """
+    for row in _read_distribution_rows(pathname):
+        name = row['variable_name']
+        if name == '':
+            continue
+
+        for col in _NUMERIC_COLS:
+            row[col] = _to_float(row[col])
+
+        shape = row['distribution_type'].lower()
+
+        if (row['low_bound'] is None and row['high_bound'] is None and row['mean'] is None and
+                row['prob_of_yes'] is None and shape != 'empirical'):
+            _logger.info(f"* {name} depends on other distributions / smart defaults")        # TODO add in lookup of attribute value
+            continue
+
+        handler = _SHAPE_HANDLERS.get(shape)
+        if handler is None:
             raise McsSystemError(f"Unknown distribution shape: '{shape}'")
 
+        rv = handler(row)
+        if rv is None:
+            continue
+
         # merge CSV-based distros with decorator-based ones
-        Distribution(name, rv)
+        if isinstance(rv, tuple):
+            dist_name, params = rv
+            Distribution(name, dist_name=dist_name, params=params)
+        else:
+            Distribution(name, rv)
 
 
 class Distribution(OpgeeObject):
+    """
+    A parameter distribution, defined either by an RV-like object with a ``ppf`` method
+    (``rv``) or by the name of a ``scipy.stats`` distribution and a dict of its parameters
+    (``dist_name`` and ``params``). The latter avoids the considerable cost of creating
+    frozen scipy distributions.
+    """
 
     instances = {}
+    _instances_list = []    # same instances as above, in order of definition, for iteration
 
-    def __init__(self, full_name, rv):
+    def __init__(self, full_name, rv=None, dist_name=None, params=None):
         self.full_name = full_name
         try:
             self.class_name, self.attr_name = split_attr_name(full_name)
@@ -134,8 +261,43 @@ class Distribution(OpgeeObject):
             raise McsUserError(f"attribute name format is 'ATTR' (same as 'Field.ATTR) or 'CLASS.ATTR'; got '{full_name}'")
 
         self.rv = rv
+        self.dist_name = dist_name
+        self._params = params or {}
+
+        if dist_name:
+            dist_cls = getattr(scipy.stats, dist_name)
+            self._ppf = ppf_kernel(dist_name) or dist_cls.ppf    # use compiled kernel if available
+            self._rvs = dist_cls.rvs
+        else:
+            self._ppf = self._rvs = None
+
+        instances = Distribution._instances_list
+        old = self.instances.get(full_name)
+        if old is None:
+            instances.append(self)
+        else:
+            instances[instances.index(old)] = self
+
         self.instances[full_name] = self
 
+    def ppf(self, q):
+        """
+        Return the values of the distribution at the percentiles ``q``.
+
+        :param q: (array-like of float) percentiles
+        :return: (numpy.ndarray) the corresponding values
+        """
+        return self._ppf(q, **self._params) if self._ppf else self.rv.ppf(q)
+
+    def rvs(self, size):
+        """
+        Return ``size`` random values drawn from the distribution.
+
+        :param size: (int) the number of values to return
+        :return: (numpy.ndarray) the values drawn
+        """
+        return self._rvs(size=size, **self._params) if self._rvs else self.rv.rvs(size=size)
+
     @classmethod
     def distro_by_name(cls, name):
         return cls.instances.get(name)
@@ -147,10 +309,21 @@ class Distribution(OpgeeObject):
 
         :return: (list of opgee.mcs.Distribution) the instances
         """
-        return cls.instances.values()
+        return cls._instances_list
+
+    @classmethod
+    def clear(cls):
+        """
+        Remove all defined Distribution instances.
+
+        :return: none
+        """
+        cls.instances.clear()
+        cls._instances_list.clear()
 
     def __str__(self):
-        return f"<Distribution '{self.full_name}' = {self.rv}>"
+        rv = f"{self.dist_name}({self._params})" if self.dist_name else self.rv
+        return f"<Distribution '{self.full_name}' = {rv}>"
 
 
 class Simulation(OpgeeObject):
@@ -165,6 +338,14 @@ class Simulation(OpgeeObject):
       representing a single trial, and each column representing the vector of values drawn for
       a single parameter. This file is created by the "gensim" sub-command.
 
+    - `{field_name}/model.pkl`: the model restricted to a single field, pickled to avoid
+      re-reading the model XML each time a worker runs the field's trials. The file is
+      ignored if it was written by different opgee code (see ``code_signature()``).
+
+    - `{field_name}/results.parquet`: the field's trial results, written incrementally as
+      trials complete if pyarrow is installed. The same results are saved to
+      `{field_name}/results.csv` when all the trials have been run.
+
     - `analysis_XXX.csv`: results for the analysis named `XXX`. Each column represents the
       results of a single output variable. Each row represents the value of all output variables
       for one trial of a single field. The field name is thus included in each row, allowing
@@ -178,21 +359,25 @@ class Simulation(OpgeeObject):
       Limiting directory size improves performance.
     """
     def __init__(self, sim_dir, analysis_name=None, trials=0, field_names=None,
-                 save_to_path=None, meta_data_only=False):
+                 save_to_path=None, meta_data_only=False, seed=None):
 
         if not os.path.isdir(sim_dir):
             raise McsUserError(f"Simulation directory '{sim_dir}' does not exist.")
 
         self.pathname = sim_dir
-        self.model_file = model_file = model_file_path(sim_dir)
+        self.model_file = model_file_path(sim_dir)
         self.model = None
-        self.model_xml_string = None
+        self._xml_mmap = None            # memory-mapped model XML file; see _read_model_xml()
+        self._model_template_pkl = None  # pickled copy of the pristine model; see load_model()
+        self._attr_maps = {}             # attribute objects by (field name, parameter names), bound to self.model
 
         self.trial_data_df = None # loaded on demand by ``trial_data`` method.
+        self._trial_index = None  # positional lookup info for trial_data_df; see _trial_index_for()
         self.trials = trials
 
         self.analysis_name = analysis_name
         self.analysis = None
+        self._field_by_name = None  # the loaded analysis' fields, keyed by name; see load_model()
         self.field_names = field_names
         self.metadata = None
 
@@ -201,13 +386,6 @@ class Simulation(OpgeeObject):
             if meta_data_only:
                 return
 
-        try:
-            _logger.debug(f"Caching file '{model_file}' as xml_string")
-            with open(model_file) as f:
-                self.model_xml_string = f.read()
-        except Exception as e:
-            raise McsSystemError(f"Failed to read model file '{model_file}' to XML string: {e}")
-
         # TBD: to allow the same trial_num to be run across fields, cache field
         #      trial_data in a dict by field name rather than a single DF
 
@@ -217,29 +395,161 @@ class Simulation(OpgeeObject):
                 return
 
         self.load_model(save_to_path=save_to_path)
+        self._add_attr_maps()
+        self._save_model_template()
+
+        # Once the model template exists, the XML is needed again only if the
+        # template is lost, in which case load_model() re-maps the file.
+        if self._model_template_pkl is not None:
+            self._release_model_xml()
 
         if trials > 0:
-            self.generate()
+            self.generate(seed=seed)
 
     def load_model(self, save_to_path=None):
         """
-        Loads the model (reading just the field being run by this Simulation) from XML
-        to avoid carrying state between trials.
+        Loads the model (reading just the field being run by this Simulation) to avoid
+        carrying state between trials. After the first load, the model is restored by
+        unpickling a copy of the pristine model, which is much faster than re-parsing
+        the XML and rebuilding the model.
 
         :return: none
         """
-        mf = ModelFile(self.model_file,
-                       xml_string=self.model_xml_string,
-                       use_default_model=False,
-                       analysis_names=[self.analysis_name],
-                       field_names=self.field_names,
-                       save_to_path=save_to_path)
-        self.model = mf.model
+        if self._model_template_pkl is not None:
+            # The attribute maps are pickled with the model so they refer to the new objects
+            self.model, self._attr_maps = pickle.loads(self._model_template_pkl)
+
+        elif not self._load_model_pickle():
+            self._attr_maps = {}
+            if self._xml_mmap is None:
+                self._read_model_xml()
+
+            mf = ModelFile(self.model_file,
+                           xml_string=self._xml_mmap,
+                           use_default_model=False,
+                           analysis_names=[self.analysis_name],
+                           field_names=self.field_names,
+                           save_to_path=save_to_path)
+            self.model = mf.model
 
         self.analysis = self.model.get_analysis(self.analysis_name, raiseError=False)
         if not self.analysis:
             raise CommandlineError(f"Analysis '{self.analysis_name}' was not found in model")
 
+        # The analysis already indexes its fields by name, so just keep a reference
+        self._field_by_name = self.analysis.field_dict
+
+    def _read_model_xml(self):
+        """
+        Memory-map the model XML file. This avoids holding a decoded copy of the file in
+        each worker process, and lets processes share the file's pages in the OS cache.
+
+        :return: none
+        """
+        model_file = self.model_file
+        try:
+            _logger.debug(f"Memory-mapping model file '{model_file}'")
+            with open(model_file, 'rb') as f:
+                self._xml_mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception as e:
+            raise McsSystemError(f"Failed to memory-map model file '{model_file}': {e}")
+
+    def _release_model_xml(self):
+        """
+        Unmap the model XML file, if it's mapped.
+
+        :return: none
+        """
+        if self._xml_mmap is not None:
+            self._xml_mmap.close()
+            self._xml_mmap = None
+
+    def model_pickle_path(self):
+        """
+        Return the pathname of the pickled model cached on disk, or None if the model
+        isn't cached. Only models restricted to a single field, as used by workers
+        running a field's trials, are cached. Models are also not cached if config
+        variables "OPGEE.StreamComponents" or "OPGEE.ClassPath" are set, since these
+        require the processing performed when loading from XML.
+
+        :return: (str or None) the pathname of the pickled model file
+        """
+        names = self.field_names
+        if not names or len(names) != 1 or getParam('OPGEE.StreamComponents') or getParam('OPGEE.ClassPath'):
+            return None
+
+        return pathjoin(self.pathname, names[0], MODEL_PICKLE)
+
+    def _load_model_pickle(self):
+        """
+        Load the model from the pickle file cached on disk, if it exists, is newer
+        than the model XML file, and was written by the same code (per ``code_signature()``).
+
+        :return: (bool) whether the model was loaded
+        """
+        path = self.model_pickle_path()
+        if not (path and os.path.exists(path) and os.path.exists(self.model_file)):
+            return False
+
+        if os.path.getmtime(path) < os.path.getmtime(self.model_file):
+            return False
+
+        try:
+            with open(path, 'rb') as f:
+                # The signature is pickled separately ahead of the model so it can be
+                # checked without unpickling a model that the current code may not load.
+                signature = pickle.load(f)
+                if signature != code_signature():
+                    _logger.info(f"Ignoring cached model '{path}' written by different opgee code")
+                    return False
+
+                data = f.read()
+            model, attr_maps = pickle.loads(data)
+        except Exception as e:
+            _logger.warning(f"Failed to load cached model '{path}'; reading model XML: {e}")
+            return False
+
+        _logger.debug(f"Loaded cached model '{path}'")
+        self.model = model
+        self._attr_maps = attr_maps
+        self._model_template_pkl = data
+
+        # Normally set when ModelFile reads the XML
+        AttrDefs.instance = model.attr_defs
+        return True
+
+    def _save_model_template(self):
+        """
+        Save a pickled copy of the freshly loaded model for use by ``load_model``.
+        If the model can't be pickled, ``load_model`` continues to rebuild the model
+        from XML. The pickled model is also written to ``model_pickle_path()``, if
+        not None, for use by later ``Simulation`` instances.
+
+        :return: none
+        """
+        if self._model_template_pkl is not None:
+            return      # loaded from the cached pickle file
+
+        try:
+            self._model_template_pkl = data = pickle.dumps((self.model, self._attr_maps), protocol=5)
+        except Exception as e:
+            _logger.warning(f"Can't pickle model; will reload from XML for each trial: {e}")
+            self._model_template_pkl = None
+            return
+
+        path = self.model_pickle_path()
+        if path:
+            # Write to a temporary file and rename it so concurrent workers don't
+            # read a partially written file.
+            tmp_path = f"{path}.{os.getpid()}"
+            try:
+                mkdirs(os.path.dirname(path))
+                with open(tmp_path, 'wb') as f:
+                    pickle.dump(code_signature(), f)
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except Exception as e:
+                _logger.warning(f"Failed to save cached model '{path}': {e}")
 
     @classmethod
     def read_metadata(cls, sim_dir):
@@ -256,14 +566,14 @@ class Simulation(OpgeeObject):
             'field_names'  : self.field_names,  # None => process all Fields in the Analysis
         }
 
-        with open(self.metadata_path(), 'w') as fp:
-            json.dump(self.metadata, fp, indent=2)
+        with open(self.metadata_path(), 'wb') as fp:
+            fp.write(_json_dumps(self.metadata))
 
     def _load_meta_data(self, field_names):
         metadata_path = self.metadata_path()
         try:
-            with open(metadata_path, 'r') as fp:
-                self.metadata = metadata = json.load(fp)
+            with open(metadata_path, 'rb') as fp:
+                self.metadata = metadata = _json_loads(fp.read())
         except Exception as e:
             raise McsUserError(f"Failed to load simulation '{metadata_path}' : {e}")
 
@@ -279,7 +589,7 @@ class Simulation(OpgeeObject):
 
     @classmethod
     def new(cls, sim_dir, model_files, analysis_name, trials,
-            field_names=None, overwrite=False, use_default_model=True):
+            field_names=None, overwrite=False, use_default_model=True, seed=None):
         """
         Create the simulation directory and the ``sandboxes`` sub-directory.
 
@@ -293,6 +603,8 @@ class Simulation(OpgeeObject):
           otherwise refuse to do so.
         :param use_default_model: (bool) whether to use the default model in etc/opgee.xml as
            the baseline model to merge with.
+        :param seed: (int or None) seed for the random number generator used to generate
+           trial data. If None, numpy's global random state is used.
         :return: a new ``Simulation`` instance
         """
         if os.path.lexists(sim_dir):
@@ -315,7 +627,7 @@ class Simulation(OpgeeObject):
             raise McsUserError(f"Analysis '{analysis_name}' was not found in model")
 
         field_names = field_names or analysis.field_names(enabled_only=True)
-        sim = cls(sim_dir, analysis_name=analysis_name, trials=trials, field_names=field_names)
+        sim = cls(sim_dir, analysis_name=analysis_name, trials=trials, field_names=field_names, seed=seed)
         return sim
 
     def field_dir(self, field):
@@ -344,6 +656,29 @@ class Simulation(OpgeeObject):
     def metadata_path(self):
         return pathjoin(self.pathname, META_DATA_FILE)
 
+    def field_paths(self, field, mkdir=False):
+        """
+        Return the pathnames of the field's files, computed once so they can be passed
+        to methods called repeatedly for the field.
+
+        :param field: (opgee.Field) the field
+        :param mkdir: (bool) whether to create the field's directory if needed
+        :return: (dict) pathnames keyed by 'field_dir', 'trial_data', 'results', 'parquet',
+           and 'failures'
+        """
+        d = self.field_dir(field)
+        if mkdir:
+            mkdirs(d)
+
+        paths = {
+            'field_dir'  : d,
+            'trial_data' : pathjoin(d, TRIAL_DATA_CSV),
+            'results'    : pathjoin(d, RESULTS_CSV),
+            'parquet'    : pathjoin(d, RESULTS_PARQUET),
+            'failures'   : pathjoin(d, FAILURES_CSV),
+        }
+        return paths
+
     def chosen_fields(self):
         a = self.analysis
         names = self.field_names
@@ -371,7 +706,7 @@ class Simulation(OpgeeObject):
         return attr_obj
 
     # TBD: need a way to specify correlations
-    def generate(self, corr_mat=None):
+    def generate(self, corr_mat=None, seed=None):
         """
         Generate simulation data for the given ``Analysis``.
 
@@ -379,57 +714,70 @@ class Simulation(OpgeeObject):
            between each pair of parameters. corrMat[i,j] gives the
            desired correlation between the i'th and j'th entries of
            the parameter list.
+        :param seed: (int or None) seed for the random number generator, passed to ``lhs``.
+           If None, numpy's global random state is used.
         :return: none
         """
         trials = self.trials
+        fields = self.chosen_fields()
 
-        for field in self.chosen_fields():
-            cols = []
-            rv_list = []
-            distributions = Distribution.distributions()
+        distributions = Distribution.distributions()
+        all_cols = [dist.attr_name if dist.class_name == 'Field' else dist.full_name for dist in distributions]
 
-            for dist in distributions:
+        # Find the parameters each field ignores because it has an explicit value for them
+        explicit_cols = {}
+        for field in fields:
+            cols = []
+            for dist, col in zip(distributions, all_cols):
                 target_attr = self.lookup(dist.full_name, field)
 
                 # If the object has an explicit value for an attribute, we ignore the distribution
                 if target_attr.explicit:
                     _logger.debug(f"{field} has an explicit value for '{dist.attr_name}'; ignoring distribution")
-                    continue
+                    cols.append(col)
 
-                rv_list.append(dist.rv)
-                cols.append(dist.attr_name if dist.class_name == 'Field' else dist.full_name)
-
-            if not cols:
+            if len(cols) == len(all_cols):
                 raise McsUserError(f"Can't run MCS: all parameters with distributions have explicit values in {field}.")
 
-            self.trial_data_df = df = lhs(rv_list, trials, columns=cols, corrMat=corr_mat)
-            df.index.name = 'trial_num'
+            explicit_cols[field.name] = cols
+
+        # Sample all parameters once, then save the subset of columns used by each field
+        df = lhs(distributions, trials, columns=all_cols, corrMat=corr_mat, seed=seed)
+        df.index.name = 'trial_num'
+
+        for field in fields:
+            self.trial_data_df = df.drop(columns=explicit_cols[field.name])
             self.save_trial_data(field)
 
+        self._add_attr_maps()
+
     def save_trial_data(self, field):
         filename = self.trial_data_path(field, mkdir=True)
         _logger.info(f"Writing '{filename}'")
         self.trial_data_df.to_csv(filename)
 
-    def save_trial_results(self, field, df, failures):
-        filename = self.results_path(field, mkdir=True)
+    def save_trial_results(self, field, df, failures, paths=None):
+        filename = paths['results'] if paths else self.results_path(field, mkdir=True)
         _logger.info(f"Writing '{filename}'")
-        df.to_csv(filename, index=False)
+        df.to_csv(filename, index=False, float_format=f'%.{DEFAULT_DIGITS}f', lineterminator='\n')
 
-        # Save info on failed trials, too
-        failures_csv = self.failures_path(field)
+        # Save info on failed trials, too. Use csv.writer to correctly quote messages
+        # containing commas, quotes, or newlines.
+        failures_csv = paths['failures'] if paths else self.failures_path(field)
         _logger.info(f"Writing {len(failures)} failures to '{failures_csv}'")
-        with open(failures_csv, 'w') as f:
-            f.write("trial_num,message\n")
-            for trial_num, msg in failures:
-                f.write(f'{trial_num},"{msg}"\n')
+        with open(failures_csv, 'w', newline='') as f:
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerow(['trial_num', 'message'])
+            writer.writerows((trial_num, str(msg)) for trial_num, msg in failures)
 
-    def field_trial_data(self, field):
+    def field_trial_data(self, field, path=None):
         """
         Read the trial data CSV from the top-level directory and return the DataFrame.
         The data is cached in the ``Simulation`` instance for re-use.
 
         :param field: (opgee.Field  or str) a field instance or name to read data for
+        :param path: (str or None) the pathname of the trial data file, if already
+           known; by default, ``trial_data_path(field)`` is used.
         :return: (pd.DataFrame) the values drawn for each field, parameter, and trial.
         """
         # TBD: allow option of using same draws across fields?
@@ -440,7 +788,7 @@ class Simulation(OpgeeObject):
         if self.trial_data_df is not None:
             return self.trial_data_df
 
-        path = self.trial_data_path(field)
+        path = path or self.trial_data_path(field)
         if not os.path.lexists(path):
             raise McsSystemError(f"Can't read trial data: '{path}' doesn't exist.")
 
@@ -461,20 +809,153 @@ class Simulation(OpgeeObject):
         :return: (pd.Series) the values for all parameters for the given trial.
         """
         df = self.field_trial_data(field)  # load data file on demand
+        pos = self._trial_position(field, trial_num)
+        return df.iloc[pos]
 
-        if trial_num not in df.index:
+    def _trial_index_for(self, field):
+        """
+        Return a tuple of (DataFrame, position map, column names, values array) for the
+        field's trial data. The position map is None when trial numbers match row positions,
+        otherwise it maps trial number to row position. This is computed once per DataFrame.
+
+        :param field: (opgee.Field or str) the field to get trial data for
+        :return: (tuple) the positional lookup info
+        """
+        df = self.field_trial_data(field)
+
+        info = self._trial_index
+        if info is None or info[0] is not df:
+            pos_map = None if df.index.equals(pd.RangeIndex(len(df))) else {t: i for i, t in enumerate(df.index)}
+            self._trial_index = info = (df, pos_map, df.columns.tolist(), df.values)
+
+        return info
+
+    def _trial_position(self, field, trial_num):
+        """
+        Return the row position of ``trial_num`` in the field's trial data.
+
+        :param field: (opgee.Field or str) the field the trial data are for
+        :param trial_num: (int) trial number
+        :return: (int) the position of the trial's row
+        :raises McsSystemError: if the trial is not found
+        """
+        df, pos_map, _, _ = self._trial_index_for(field)
+
+        if pos_map is None:
+            pos = trial_num if 0 <= trial_num < len(df) else None
+        else:
+            pos = pos_map.get(trial_num)
+
+        if pos is None:
             path = self.trial_data_path(field)
             raise McsSystemError(f"Trial {trial_num} was not found in '{path}'")
 
-        s = df.loc[trial_num]
-        return s
+        return pos
+
+    def attr_map(self, field, names):
+        """
+        Return a dict mapping each parameter name in ``names`` to its attribute object
+        in ``field``. Maps for the columns of the fields' trial data files are computed
+        when the model is first loaded and saved with the pickled model template (see
+        ``_add_attr_maps``), so they're restored with each reloaded model. Maps for
+        other ``names`` are computed on demand and kept until the model is reloaded.
+
+        :param field: (Field) a field in the currently loaded model
+        :param names: (iterable of str) the names of the parameters
+        :return: (dict) the attribute objects keyed by parameter name
+        """
+        names = tuple(names)
+        key = (field.name, names)
+
+        attr_map = self._attr_maps.get(key)
+        if attr_map is None:
+            attr_map = self._attr_maps[key] = {name: self.lookup(name, field) for name in names}
+
+        return attr_map
+
+    def _add_attr_maps(self):
+        """
+        Compute the attribute maps for the columns of each chosen field's trial data file,
+        if it exists, so they're saved with the pickled model template rather than looked
+        up again for every trial. Must be called while the model is unmodified since it
+        was loaded. If any maps are added and the template has already been pickled, it's
+        re-pickled (once, here, rather than while running trials).
+
+        :return: none
+        """
+        added = False
+        for field in self.chosen_fields():
+            path = self.trial_data_path(field)
+            if not os.path.exists(path):
+                continue
+
+            try:
+                names = pd.read_csv(path, index_col='trial_num', nrows=0).columns.tolist()
+            except Exception as e:
+                _logger.debug(f"Can't read the columns of '{path}': {e}")
+                continue
+
+            if (field.name, tuple(names)) not in self._attr_maps:
+                self.attr_map(field, names)
+                added = True
+
+        if added and self._model_template_pkl is not None:
+            self._model_template_pkl = pickle.dumps((self.model, self._attr_maps), protocol=5)
+
+    def iter_trial_data(self, field, trial_nums=None, path=None):
+        """
+        Read the field's trial data CSV in chunks of ``TRIAL_DATA_CHUNK`` rows, yielding
+        the values for each trial in ``trial_nums``, in the order they appear in the file.
+        Unlike ``field_trial_data``, this avoids holding all the trial data in memory.
+
+        :param field: (opgee.Field) the field to read trial data for
+        :param trial_nums: (iterable of int) the trials to return, or ``None`` for all trials
+        :param path: (str or None) the pathname of the trial data file, if already
+           known; by default, ``trial_data_path(field)`` is used.
+        :return: (generator of tuples) ``(trial_num, names, values)`` where ``names`` is
+           the list of parameter names and ``values`` is the array of values for the trial.
+        """
+        path = path or self.trial_data_path(field)
+        if not os.path.lexists(path):
+            raise McsSystemError(f"Can't read trial data: '{path}' doesn't exist.")
+
+        wanted = None if trial_nums is None else set(trial_nums)
+
+        try:
+            reader = pd.read_csv(path, index_col='trial_num', chunksize=TRIAL_DATA_CHUNK)
+        except Exception as e:
+            raise McsSystemError(f"Can't read trial data from '{path}': {e}")
+
+        with reader:
+            for chunk in reader:
+                names = chunk.columns.tolist()
+                for trial_num, values in zip(chunk.index.tolist(), chunk.values):
+                    if wanted is None or trial_num in wanted:
+                        yield trial_num, names, values
+
+    def set_trial_data(self, field, trial_num, row=None):
+        """
+        Set the values of the parameters for the given trial in ``field``.
 
-    def set_trial_data(self, field, trial_num):
+        :param field: (opgee.Field) the field to set values in
+        :param trial_num: (int) trial number
+        :param row: (tuple or None) ``(names, values)`` for the trial, as yielded by
+           ``iter_trial_data``. If ``None``, the values are read from ``field_trial_data``.
+        :return: none
+        """
         _logger.debug(f"set_trial_data for trial {trial_num})")
-        data = self.trial_data(field, trial_num)
+        if row is None:
+            # Read the row's values directly rather than constructing a Series
+            pos = self._trial_position(field, trial_num)
+            _, _, names, values = self._trial_index
+            values = values[pos]
+        else:
+            names, values = row
+
+        attr_map = self.attr_map(field, names)
 
-        for name, value in data.items():
-            attr = self.lookup(name, field)
+        for name, value in zip(names, values):
+            attr = attr_map[name]
             attr.explicit = True
             attr.set_value(value)
 
@@ -482,82 +963,195 @@ class Simulation(OpgeeObject):
             # if name == 'WOR' and value == 0:
             #     pass
 
-    def run_field(self, field, trial_nums=None):
+    def run_trial(self, field_name, trial_num, row=None):
+        """
+        Run a single trial for the named field, reloading the model first to
+        avoid carrying state between trials.
+
+        :param field_name: (str) the name of the Field to evaluate
+        :param trial_num: (int) the trial number to run
+        :param row: (tuple or None) the trial data, as passed to ``set_trial_data``
+        :return: (tuple of float) the values for CI, total GHG, combustion,
+           land use, VFF, and other emissions.
+        """
+        # Restore the pristine model from the pickled template to avoid stale state
+        self.load_model()
+
+        # Use the new instance of field from the reloaded model
+        field = self._field_by_name.get(field_name)
+        if field is None:
+            raise McsSystemError(f"Field '{field_name}' was not found in analysis '{self.analysis_name}'")
+
+        self.set_trial_data(field, trial_num, row=row)
+
+        # TBD: test re-running
+        #    SmartDefault.apply_defaults(field, analysis=self.analysis)
+        #  however, changes to structure are not applied unless we call
+        #  the function field.finalize_process_graph(), which also calls
+        #  SmartDefault.apply_defaults() and resolve_process_choices(),
+        #  and resets the field's network graph.
+
+        field.run(self.analysis, compute_ci=True, trial_num=trial_num)
+        # field.report()
+
+        ci = field.carbon_intensity     # computed and saved in field.run()
+
+        # energy = field.energy.data
+        emissions = field.emissions
+
+        # Extract the magnitudes once rather than operating on each Quantity.
+        # Columns are in the order of Emissions.categories.
+        ghg = emissions.ghg_magnitudes()
+        vff = ghg[_VENTING] + ghg[_FLARING] + ghg[_FUGITIVES]
+
+        values = np.array([ci.m, ghg.sum(), ghg[_COMBUSTION], ghg[_LAND_USE], vff, ghg[_OTHER]])
+        return values.round(DEFAULT_DIGITS)
+
+    def run_trial_safely(self, field_name, trial_num, row=None):
+        """
+        Call ``run_trial``, converting any exception raised into an error message
+        so the outcome can be returned from a worker process.
+
+        :param field_name: (str) the name of the Field to evaluate
+        :param trial_num: (int) the trial number to run
+        :param row: (tuple or None) the trial data, as passed to ``set_trial_data``
+        :return: (tuple) ``(trial_num, values)`` where ``values`` is the tuple returned
+           by ``run_trial`` if the trial succeeded, or a ``str`` describing the error.
+        """
+        try:
+            return trial_num, self.run_trial(field_name, trial_num, row=row)
+
+        except Exception as e:
+            _logger.warning(f"Exception raised in trial {trial_num} in field '{field_name}': {e}")
+            _logger.debug(traceback.format_exc())
+            return trial_num, str(e)
+
+        # The following would exit the trial loop, so probably better to skip & continue
+        # except OpgeeException as e:
+        #     raise TrialErrorWrapper(e, trial_num)
+
+    def run_field(self, field, trial_nums=None, num_workers=None):
         """
         Run the Monte Carlo simulation for the given field and trial numbers.
 
         :param field: (opgee.Field) the Field to evaluate in MCS
         :param trial_nums: (iterator of ints) the trial numbers to run, or
            ``None`` to run all trials.
+        :param num_workers: (int) the number of processes to use to run trials.
+           If ``None``, the value of config variable "OPGEE.TrialWorkers" is used.
+           A value of 0 means use one process per CPU; 1 runs trials serially in
+           the current process.
         :return: (int) the number of successfully run trials
         """
+        trial_nums = list(range(self.trials) if trial_nums is None else trial_nums)
 
-        trial_nums = range(self.trials) if trial_nums is None else trial_nums
+        if num_workers is None:
+            num_workers = getParamAsInt('OPGEE.TrialWorkers')
 
-        completed = 0
-        results = []
-        failures = []
-
-        for trial_num in trial_nums:
-            try:
-                # Reload from cached XML string to avoid stale state
-                self.load_model()
+        num_workers = min(num_workers or os.cpu_count() or 1, len(trial_nums))
 
-                # Use the new instance of field from the reloaded model
-                field = self.analysis.get_field(field.name)
+        field_name = field.name
+        count = len(trial_nums)
 
-                self.set_trial_data(field, trial_num)
+        # Results are stored by row in preallocated arrays; failures are much less common.
+        trial_col = np.empty(count, dtype=np.int64)
+        values_arr = np.empty((count, len(RESULT_COLS)), dtype=np.float64)
+        completed = 0
+        failures = []
 
-                # TBD: test re-running
-                #    SmartDefault.apply_defaults(field, analysis=self.analysis)
-                #  however, changes to structure are not applied unless we call
-                #  the function field.finalize_process_graph(), which also calls
-                #  SmartDefault.apply_defaults() and resolve_process_choices(),
-                #  and resets the field's network graph.
+        paths = self.field_paths(field, mkdir=True)
 
-                field.run(self.analysis, compute_ci=True, trial_num=trial_num)
-                # field.report()
-                completed += 1
+        # If pyarrow is available, completed trials are also written to a Parquet file as
+        # they accumulate, so results survive if the run is interrupted.
+        writer = None
+        if pq is not None:
+            schema = pa.schema([('trial_num', pa.int64())] + [(col, pa.float64()) for col in RESULT_COLS])
+            writer = pq.ParquetWriter(paths['parquet'], schema)
+        written = 0
 
-            except Exception as e:
-                failures.append((trial_num, e))
-                _logger.warning(f"Exception raised in trial {trial_num} in {field}: {e}")
-                _logger.debug(traceback.format_exc())
-                continue
-
-            # The following would exit the trial loop, so probably better to skip & continue
-            # except OpgeeException as e:
-            #     raise TrialErrorWrapper(e, trial_num)
+        def _write_parquet(force=False):
+            nonlocal written
+            if writer is None or completed == written or (completed - written < TRIAL_DATA_CHUNK and not force):
+                return
 
-            ci = field.carbon_intensity     # computed and saved in field.run()
+            columns = [trial_col[written:completed]] + [values_arr[written:completed, i] for i in range(len(RESULT_COLS))]
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+            written = completed
 
-            # energy = field.energy.data
-            emissions = field.emissions.data
+        def _record(outcomes):
+            nonlocal completed
+            for trial_num, values in outcomes:
+                if isinstance(values, str):
+                    failures.append((trial_num, values))
+                else:
+                    trial_col[completed] = trial_num
+                    values_arr[completed] = values
+                    completed += 1
 
-            ghg = emissions.loc['GHG']
-            total_ghg = ghg.sum()
-            vff = ghg['Venting'] + ghg['Flaring'] + ghg['Fugitives']
+            _write_parquet()
 
-            tup = (trial_num,
-                   magnitude(ci),
-                   magnitude(total_ghg),
-                   magnitude(ghg['Combustion']),
-                   magnitude(ghg['Land-use']),
-                   magnitude(vff),
-                   magnitude(ghg['Other']))
+        # Trial data are read in chunks so memory use doesn't grow with the number of trials.
+        # If the data can't be read, the trials not yet run are recorded as failures.
+        read_error = None
 
-            results.append(tup)
+        def _iter_rows():
+            nonlocal read_error
+            try:
+                yield from self.iter_trial_data(field, trial_nums, path=paths['trial_data'])
+            except Exception as e:
+                read_error = e
+                _logger.error(f"Failed to read trial data for '{field_name}': {e}")
 
-        cols = ['trial_num',
-                'CI',
-                'total_GHG',
-                'combustion',
-                'land_use',
-                'VFF',
-                'other']
+        rows = _iter_rows()
+        found = set()
 
-        df = pd.DataFrame.from_records(results, columns=cols)
-        self.save_trial_results(field, df, failures)
+        try:
+            if num_workers > 1:
+                from concurrent.futures import ProcessPoolExecutor
+
+                _logger.info(f"Running {count} trials of '{field_name}' using {num_workers} processes")
+
+                with ProcessPoolExecutor(max_workers=num_workers,
+                                         initializer=_init_trial_worker,
+                                         initargs=(self.pathname, field_name)) as executor:
+                    # executor.map() submits all its inputs at once, so pass it one batch at a
+                    # time to bound memory use. The next batch is submitted before the results
+                    # of the current one are collected, so workers aren't left idle between
+                    # batches.
+                    pending = None
+                    while batch := list(islice(rows, TRIAL_DATA_CHUNK)):
+                        trials, names, values = zip(*batch)
+                        found.update(trials)
+
+                        # About 4 tasks per worker, so the work is spread across all workers
+                        chunksize = max(1, len(batch) // (4 * num_workers))
+                        results = executor.map(_run_one_trial, repeat(field_name), trials, names, values,
+                                               chunksize=chunksize)
+                        if pending is not None:
+                            _record(pending)
+                        pending = results
+
+                    if pending is not None:
+                        _record(pending)
+            else:
+                for trial_num, names, values in rows:
+                    found.add(trial_num)
+                    _record([self.run_trial_safely(field_name, trial_num, row=(names, values))])
+        finally:
+            if writer is not None:
+                _write_parquet(force=True)
+                writer.close()
+
+        if len(found) < len(trial_nums):
+            path = paths['trial_data']
+            failures.extend((trial_num, str(read_error) if read_error else f"Trial {trial_num} was not found in '{path}'")
+                            for trial_num in trial_nums if trial_num not in found)
+
+        _logger.debug(f"Tables used running '{field_name}': {TableManager.accessed_tables()}")
+
+        df = pd.DataFrame(values_arr[:completed], columns=RESULT_COLS)
+        df.insert(0, 'trial_num', trial_col[:completed])
+        self.save_trial_results(field, df, failures, paths=paths)
 
         return completed
 
@@ -6,12 +6,16 @@
 # Copyright (c) 2021-2022 The Board of Trustees of the Leland Stanford Junior University.
 # See LICENSE.txt for license details.
 #
-import pint
+import csv
+from functools import cached_property
+import numpy as np
 
 from . import ureg
 from .analysis import Analysis
 from .container import Container
-from .core import elt_name, magnitude, instantiate_subelts
+from .core import elt_name, instantiate_subelts, subelts_by_tag
+from .emissions import Emissions
+from .energy import Energy
 from .error import OpgeeException, CommandlineError
 from .field import Field
 from .log import getLogger
@@ -20,92 +24,116 @@ from .table_update import TableUpdate
 
 DEFAULT_SCHEMA_VERSION = "4.0.0.a"
 
-_logger = getLogger(__name__)
+# Buffer size used when writing results files
+_WRITE_BUFFER_SIZE = 1 << 20
 
-class Model(Container):
+# Rows per block when writing a DataFrame with to_csv
+_CSV_CHUNK_ROWS = 100_000
 
-    def __init__(self, name, attr_dict=None, table_updates=None):
-        super().__init__(name, attr_dict=attr_dict, parent=None)
+# Converts an emission rate in Emissions.units() divided by an energy flow rate in
+# MJ/day to a carbon intensity in g/MJ
+_CI_FACTOR = (ureg.Quantity(1.0, Emissions.units()) / ureg.Quantity(1.0, "MJ/day")).to("grams/MJ").m
 
-        Model.instance = self
-        self.schema_version = attr_dict.get('schema_version', DEFAULT_SCHEMA_VERSION)
+_logger = getLogger(__name__)
 
-        # These are set in from_xml after instantiation
-        self.analysis_dict = None
-        self.field_dict = None
+def _lazy_table(name):
+    """
+    Return a cached property that reads the named table from the model's
+    ``TableManager`` on first access, so tables not used by a model's fields
+    are never loaded.
 
-        self.pathnames = None  # set by calling set_pathnames(path)
+    :param name: (str) the name of a table known to ``TableManager``
+    :return: (functools.cached_property) the property
+    """
+    def get_table(self):
+        return self.table_mgr.get_table(name)
 
-        # parameters controlling process cyclic calculations
-        self.maximum_iterations = self.attr('maximum_iterations')
-        self.maximum_change = self.attr('maximum_change')
+    get_table.__doc__ = f"The '{name}' table (loaded on first access)"
+    return cached_property(get_table)
 
-        self.table_mgr = tbl_mgr = TableManager(updates=table_updates)
 
-        # load all the GWP options
-        df = tbl_mgr.get_table('GWP')
+class Model(Container):
+    # TODO: to support PRELIM, we might want a way to handle these that is less model-specific
+    #  Perhaps separate namespaces for each model, like
+    #  self.table_dict = {'OPGEE' : OpgeeTables(tbl_mgr), 'PRELIM' : PrelimTables(tbl_mgr)}
+    #  Then all the OPGEE-specific instance vars or pushed down into an OpgeeTables instance
 
-        self.gwp_horizons = list(df.Years.unique())
-        self.gwp_versions = list(df.columns[2:])
-        self.gwp_dict = {y: df.query('Years == @y').set_index('Gas', drop=True).drop('Years', axis='columns') for y in
-                         self.gwp_horizons}
+    # Tables are loaded on first access; see _lazy_table()
+    vertical_drill_df = _lazy_table("vertical-drilling-energy-intensity")
+    horizontal_drill_df = _lazy_table("horizontal-drilling-energy-intensity")
+    fracture_energy = _lazy_table("fracture-consumption-table")
+    land_use_EF = _lazy_table("land-use-EF")
 
-        constants_df = tbl_mgr.get_table('constants')
-        self.constants = {name: ureg.Quantity(float(row.value), row.unit) for name, row in constants_df.iterrows()}
+    process_EF_df = _lazy_table("process-specific-EF")
 
-        # TODO: to support PRELIM, we might want a way to handle these that is less model-specific
-        #  Perhaps separate namespaces for each model, like
-        #  self.table_dict = {'OPGEE' : OpgeeTables(tbl_mgr), 'PRELIM' : PrelimTables(tbl_mgr)}
-        #  Then all the OPGEE-specific instance vars or pushed down into an OpgeeTables instance
+    imported_gas_comp = _lazy_table("imported-gas-comp")
 
-        self.vertical_drill_df = tbl_mgr.get_table("vertical-drilling-energy-intensity")
-        self.horizontal_drill_df = tbl_mgr.get_table("horizontal-drilling-energy-intensity")
-        self.fracture_energy = tbl_mgr.get_table("fracture-consumption-table")
-        self.land_use_EF = tbl_mgr.get_table("land-use-EF")
+    water_treatment = _lazy_table("water-treatment")
 
-        self.process_EF_df = tbl_mgr.get_table("process-specific-EF")
+    heavy_oil_upgrading = _lazy_table("heavy-oil-upgrading")
 
-        self.imported_gas_comp = tbl_mgr.get_table("imported-gas-comp")
+    transport_parameter = _lazy_table("transport-parameter")
+    transport_share_fuel = _lazy_table("transport-share-fuel")
+    transport_by_mode = _lazy_table("transport-by-mode")
 
-        self.water_treatment = tbl_mgr.get_table("water-treatment")
+    mining_energy_intensity = _lazy_table("bitumen-mining-energy-intensity")
 
-        self.heavy_oil_upgrading = tbl_mgr.get_table("heavy-oil-upgrading")
+    prod_combustion_coeff = _lazy_table("product-combustion-coeff")
+    reaction_combustion_coeff = _lazy_table("reaction-combustion-coeff")
 
-        self.transport_parameter = tbl_mgr.get_table("transport-parameter")
-        self.transport_share_fuel = tbl_mgr.get_table("transport-share-fuel")
-        self.transport_by_mode = tbl_mgr.get_table("transport-by-mode")
+    gas_turbine_tbl = _lazy_table("gas-turbine-specs")
 
-        self.mining_energy_intensity = tbl_mgr.get_table("bitumen-mining-energy-intensity")
+    gas_dehydration_tbl = _lazy_table("gas-dehydration")
+    AGR_tbl = _lazy_table("acid-gas-removal")
+    ryan_holmes_process_tbl = _lazy_table("ryan-holmes-process")
+    demethanizer = _lazy_table("demethanizer")
+    upstream_CI = _lazy_table("upstream-CI")
 
-        self.prod_combustion_coeff = tbl_mgr.get_table("product-combustion-coeff")
-        self.reaction_combustion_coeff = tbl_mgr.get_table("reaction-combustion-coeff")
+    pubchem_cid = _lazy_table("pubchem-cid")
 
-        self.gas_turbine_tbl = tbl_mgr.get_table("gas-turbine-specs")
+    # tables for the fugitive model
+    loss_matrix_gas = _lazy_table("loss-matrix-gas")
+    loss_matrix_oil = _lazy_table("loss-matrix-oil")
+    productivity_gas = _lazy_table("productivity-gas")
+    productivity_oil = _lazy_table("productivity-oil")
 
-        self.gas_dehydration_tbl = tbl_mgr.get_table("gas-dehydration")
-        self.AGR_tbl = tbl_mgr.get_table("acid-gas-removal")
-        self.ryan_holmes_process_tbl = tbl_mgr.get_table("ryan-holmes-process")
-        self.demethanizer = tbl_mgr.get_table("demethanizer")
-        self.upstream_CI = tbl_mgr.get_table("upstream-CI")
+    site_fugitive_processing_unit_breakdown = _lazy_table("site-fugitive-processing-unit-breakdown")
+    well_completion_and_workover_C1_rate = _lazy_table("well-completion-and-workover-C1-rate")
 
-        self.pubchem_cid = tbl_mgr.get_table("pubchem-cid")
+    def __init__(self, name, attr_dict=None, table_updates=None):
+        super().__init__(name, attr_dict=attr_dict, parent=None)
 
-        # tables for the fugitive model
-        self.loss_matrix_gas = tbl_mgr.get_table("loss-matrix-gas")
-        self.loss_matrix_oil = tbl_mgr.get_table("loss-matrix-oil")
-        self.productivity_gas = tbl_mgr.get_table("productivity-gas")
-        self.productivity_oil = tbl_mgr.get_table("productivity-oil")
+        Model.instance = self
+        self.schema_version = attr_dict.get('schema_version', DEFAULT_SCHEMA_VERSION)
+
+        # These are set in from_xml after instantiation
+        self.analysis_dict = None
+        self.field_dict = None
 
-        self.site_fugitive_processing_unit_breakdown = tbl_mgr.get_table("site-fugitive-processing-unit-breakdown")
-        self.well_completion_and_workover_C1_rate = tbl_mgr.get_table("well-completion-and-workover-C1-rate")
+        self.pathnames = None  # set by calling set_pathnames(path)
 
         # TBD: should these be settable per Analysis?
         # parameters controlling process cyclic calculations
         self.maximum_iterations = self.attr('maximum_iterations')
         self.maximum_change = self.attr('maximum_change')
 
-        self.pathnames = None  # set by calling set_pathnames(path)
-        # TBD: apply table updates
+        self.table_mgr = tbl_mgr = TableManager(updates=table_updates)
+
+        # load all the GWP options
+        df = tbl_mgr.get_table('GWP')
+
+        self.gwp_horizons = list(df.Years.unique())
+        self.gwp_versions = list(df.columns[2:])
+
+        # Partition the table by horizon in one pass rather than querying once per horizon.
+        # Gas names are stored as a categorical to make label lookups cheaper.
+        groups = df.drop(columns='Years').astype({'Gas': 'category'}).groupby(df['Years'], sort=False)
+        self.gwp_dict = {y: group.set_index('Gas', drop=True) for y, group in groups}
+
+        constants_df = tbl_mgr.get_table('constants')
+        values = constants_df['value'].to_numpy(dtype=float)
+        self.constants = {name: ureg.Quantity(value, unit) for name, value, unit in
+                          zip(constants_df.index, values, constants_df['unit'])}
 
     def set_pathnames(self, pathnames):
         self.pathnames = pathnames
@@ -170,19 +198,19 @@ class Model(Container):
             _logger.error(f"Can't save results: zero energy flow at system boundary for {field}")
             return None
 
-        def partial_ci(obj):
-            ghgs = obj.emissions.data.sum(axis='columns')['GHG']
-            if not isinstance(ghgs, pint.Quantity):
-                ghgs = ureg.Quantity(ghgs, "tonne/day")
+        objs = [obj for obj in nodes if not isinstance(obj, Boundary)]
+        if not objs:
+            return []
 
-            ci = ghgs / energy
-            # convert to g/MJ, but we don't need units in CSV file
-            return ci.to("grams/MJ").m
+        # Sum the GHG emissions of all nodes in one operation, then convert them all to
+        # g/MJ (we don't need units in CSV file) with a single scalar factor.
+        ghgs = np.stack([obj.emissions.ghg_magnitudes() for obj in objs]).sum(axis=1)
+        cis = ghgs * (_CI_FACTOR / energy.m_as("MJ/day"))
 
-        results = [(obj.name, partial_ci(obj)) for obj in nodes if not isinstance(obj, Boundary)]
+        results = [(obj.name, ci) for obj, ci in zip(objs, cis.tolist())]
         return results
 
-    def save_results(self, tuples, csvpath, by_process=False):
+    def save_results(self, tuples, csvpath, by_process=False, rows_per_chunk=100_000):
         """
         Save the carbon intensity (CI) results for the indicated (field, analysis)
         tuples to the indicated CSV pathname, ``csvpath``. By default, results are
@@ -192,67 +220,86 @@ class Model(Container):
         :param tuples: (sequence of tuples of (analysis, field) instances)
         :param by_process: (bool) if True, write results by process. If False,
             write results for top-level processes and aggregators only.
+        :param rows_per_chunk: (int) the number of rows to accumulate before
+            writing them to the file, which bounds memory use for large runs.
         :return: none
         """
-        import pandas as pd
+        _logger.info(f"Writing '{csvpath}'")
 
-        rows = []
+        # Rows are written in chunks as results are computed rather than collected first
+        with open(csvpath, 'w', buffering=_WRITE_BUFFER_SIZE, newline='') as fp:
+            writer = csv.writer(fp, lineterminator='\n')
+            writer.writerow(('analysis', 'field', 'node', 'CI'))
+            rows = []
 
-        for (field, analysis) in tuples:
-            nodes = field.processes() if by_process else field.children()
-            ci_tuples = self.partial_ci_values(analysis, field, nodes)
-
-            fld_name = field.name
-            ana_name = analysis.name
-
-            rows.append({'analysis': ana_name,
-                         'field': fld_name,
-                         'node': 'TOTAL',
-                         'CI': field.carbon_intensity.m})
-
-            # ignore failed fields
-            if ci_tuples is not None:
-                for name, ci in ci_tuples:
-                    rows.append({'analysis' : ana_name,
-                                 'field' : fld_name,
-                                 'node' : name,
-                                 'CI' : ci})
-
-        df = pd.DataFrame(data=rows)
-        _logger.info(f"Writing '{csvpath}'")
-        df.to_csv(csvpath, index=False)
+            for (field, analysis) in tuples:
+                nodes = field.processes() if by_process else field.children()
+                ci_tuples = self.partial_ci_values(analysis, field, nodes)
+
+                fld_name = field.name
+                ana_name = analysis.name
+
+                rows.append((ana_name, fld_name, 'TOTAL', field.carbon_intensity.m))
+
+                # ignore failed fields
+                if ci_tuples is not None:
+                    rows.extend((ana_name, fld_name, name, ci) for name, ci in ci_tuples)
+
+                if len(rows) >= rows_per_chunk:
+                    writer.writerows(rows)
+                    fp.flush()
+                    rows.clear()
+
+            writer.writerows(rows)
 
     def save_for_comparison(self, tuples, csvpath):
         import pandas as pd
 
-        energy_cols = []
-        emission_cols = []
-
-        def total_emissions(proc, gwp):
-            rates = proc.emissions.rates(gwp)
-            total = rates.loc["GHG"].sum()
-            return magnitude(total)
+        field_names = []
+        field_totals = []   # (process names, energy totals, GHG totals) for each field
+        energy_units = Energy.units()
 
         for (field, analysis) in tuples:
+            field_names.append(field.name)
             procs = field.processes()
-            energy_by_proc = {proc.name: magnitude(proc.energy.rates().sum()) for proc in procs}
-            s = pd.Series(energy_by_proc, name=field.name)
-            energy_cols.append(s)
+            if not procs:
+                field_totals.append(([], None, None))
+                continue
+
+            names = [proc.name for proc in procs]
+            gwp = analysis.gwp
+
+            energy = np.stack([proc.energy.rates().values.quantity.m_as(energy_units) for proc in procs])
+
+            for proc in procs:
+                proc.emissions.compute_GHG(gwp)
+
+            ghgs = np.stack([proc.emissions.ghg_magnitudes() for proc in procs])
+            # NaN rates are skipped, as in pint's Series.sum()
+            field_totals.append((names, np.nansum(energy, axis=1), np.nansum(ghgs, axis=1)))
+
+        # Rows are the union of all fields' process names; a process absent from a field is NaN
+        all_procs = sorted({name for names, _, _ in field_totals for name in names})
+        row_of = {name: i for i, name in enumerate(all_procs)}
 
-            emissions_by_proc = {proc.name: total_emissions(proc, analysis.gwp) for proc in procs}
-            s = pd.Series(emissions_by_proc, name=field.name)
-            emission_cols.append(s)
+        shape = (len(all_procs), len(field_names))
+        energy_mat = np.full(shape, np.nan)
+        emission_mat = np.full(shape, np.nan)
 
-        def _save(columns, csvpath):
-            df = pd.concat(columns, axis='columns')
-            df.index.name = 'process'
-            df.sort_index(axis='rows', inplace=True)
+        for col, (names, energy, ghgs) in enumerate(field_totals):
+            if names:
+                rows = [row_of[name] for name in names]
+                energy_mat[rows, col] = energy
+                emission_mat[rows, col] = ghgs
 
+        def _save(mat, csvpath):
             _logger.info(f"Writing '{csvpath}'")
-            df.to_csv(csvpath)
+            df = pd.DataFrame(mat, index=pd.Index(all_procs, name='process'), columns=field_names)
+            with open(csvpath, 'w', buffering=_WRITE_BUFFER_SIZE, newline='') as fp:
+                df.to_csv(fp, lineterminator='\n', chunksize=_CSV_CHUNK_ROWS)
 
-        _save(energy_cols, "energy-" + csvpath)
-        _save(emission_cols, "emissions-" + csvpath)
+        _save(energy_mat, "energy-" + csvpath)
+        _save(emission_mat, "emissions-" + csvpath)
 
     @classmethod
     def from_xml(cls, elt, parent=None, analysis_names=None, field_names=None):
@@ -266,17 +313,18 @@ class Model(Container):
         :return: (Model) instance populated from XML
         """
         attr_dict = cls.instantiate_attrs(elt)
-        table_updates = instantiate_subelts(elt, TableUpdate, as_dict=True)
+        by_tag = subelts_by_tag(elt)
+        table_updates = instantiate_subelts(elt, TableUpdate, as_dict=True, by_tag=by_tag)
 
         model = Model(elt_name(elt), attr_dict=attr_dict, table_updates=table_updates)
 
-        fields = instantiate_subelts(elt, Field, parent=model, include_names=field_names)
+        fields = instantiate_subelts(elt, Field, parent=model, include_names=field_names, by_tag=by_tag)
         if field_names and not fields:
             raise CommandlineError(f"Indicated field names {field_names} were not found in model")
 
         model.field_dict = model.adopt(fields, asDict=True)
 
-        analyses = instantiate_subelts(elt, Analysis, parent=model, include_names=analysis_names)
+        analyses = instantiate_subelts(elt, Analysis, parent=model, include_names=analysis_names, by_tag=by_tag)
         if analysis_names and not analyses:
             raise CommandlineError(f"Specified analyses {analysis_names} not found in model")
 
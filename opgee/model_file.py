@@ -205,8 +205,8 @@ class ModelFile(XMLFile):
 
         :param pathnames: (str, or list or tuple of str) the name(s) of the file(s) to read.
            If None or empty list, ``use_default_model`` must be True, or ``xml_string`` must be used.
-        :param xml_string: (str) text representation of XML to use instead of ``pathnames``. If provided,
-            this string must comprise the full model XML, including attribute definitions. (That is, the
+        :param xml_string: (str, bytes, or mmap.mmap) text representation of XML to use instead of
+            ``pathnames``. If provided, this must comprise the full model XML, including attribute definitions. (That is, the
             file "etc/attributes.xml" will not be read. Also, no "final" XML is written out and the
             ``save_to_path`` argument is ignored (and no default path is used). Note that ``xml_string``
             is used primarily to reduce disk I/O in Monte Carlo mode.
@@ -364,6 +364,17 @@ class Process(AttributeMixin, XmlInstantiable):
         """
         self.emissions.add_rates(category, **kwargs)
 
+    def compute_emission_rates(self, analysis, procs_to_exclude=None):
+        """
+        Compute the GHG value of this process' emissions using the current choice
+        of GWP values in the Analysis containing this process.
+
+        :param procs_to_exclude: ignored here, but provided for API consistency with
+            Container class method of same name
+        :return: none
+        """
+        self.emissions.compute_GHG(analysis.gwp)
+
     def get_emission_rates(self, analysis, procs_to_exclude=None):
         """
         Return the emission rates and the calculated GHG value. Uses the current
@@ -26,8 +26,7 @@ class SourGasInjection(Process):
         gas_fugitives = self.set_gas_fugitives(input, loss_rate)
 
         gas_to_reservoir = self.find_output_stream("gas for reservoir")
-        gas_to_reservoir.copy_flow_rates_from(input)
-        gas_to_reservoir.subtract_rates_from(gas_fugitives)
+        gas_to_reservoir.set_from_difference(input, gas_fugitives)
 
         # emissions
         emissions = self.emissions
@@ -8,9 +8,12 @@
 #
 import re
 from copy import copy
+from itertools import combinations
 
+import numpy as np
 import pandas as pd
 import pint
+import pint_pandas
 
 from . import ureg
 from .attributes import AttributeMixin
@@ -32,6 +35,56 @@ _carbon_number_prog = re.compile(r'^C(\d+)$')
 _hydrocarbon_prog = re.compile(r'^(C\d+)H(\d+)$')
 
 
+# numba is optional; without it, stream arithmetic on magnitudes uses numpy.
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True)
+    def _subtract_clipped(a, b, out):
+        """Set ``out`` to ``a - b``, with negative values set to zero."""
+        for i in range(a.size):
+            d = a[i] - b[i]
+            out[i] = 0.0 if d < 0.0 else d     # NaN is passed through, as with Series.clip()
+else:
+    def _subtract_clipped(a, b, out):
+        """Set ``out`` to ``a - b``, with negative values set to zero."""
+        np.subtract(a, b, out=out)
+        out[out < 0.0] = 0.0
+
+def _clipped_difference(ours, theirs):
+    """
+    Return ``ours - theirs`` with negative values set to zero, where ``ours`` and
+    ``theirs`` are columns of ``Stream.components``.
+    """
+    dtype = ours.dtype
+
+    if isinstance(dtype, pint_pandas.PintType) and isinstance(theirs.dtype, pint_pandas.PintType):
+        # Operate on the magnitudes directly, avoiding pandas and pint overhead
+        a = ours.values.quantity.m_as(dtype.units)
+        b = theirs.values.quantity.m_as(dtype.units)
+        out = np.empty_like(a, dtype=np.float64)
+        _subtract_clipped(np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64), out)
+        return pint_pandas.PintArray(out, dtype=dtype)
+
+    return (ours - theirs).clip(0)
+
+def _float_magnitudes(column, units):
+    """
+    Return the numpy array of magnitudes backing ``column`` (a column of
+    ``Stream.components``), which may be modified in place, or None if the
+    column doesn't hold float64 values with the given ``units``.
+    """
+    dtype = column.dtype
+    if not (isinstance(dtype, pint_pandas.PintType) and dtype.units == units):
+        return None
+
+    data = column.values._data
+    return data if data.dtype == np.float64 else None
+
+
 def is_carbon_number(name):
     return (_carbon_number_prog.match(name) is not None)
 
@@ -566,8 +619,60 @@ class Stream(AttributeMixin, XmlInstantiable):
             return
 
         self.initialized = True
-        self.components[phase] -= stream.components[phase]
-        self.components[phase] = self.components[phase].clip(0)
+        self.components[phase] = _clipped_difference(self.components[phase], stream.components[phase])
+
+    def set_from_difference(self, stream, subtrahend, phase=PHASE_GAS):
+        """
+        Set ``self`` to a copy of ``stream`` with the ``phase`` mass flow rates of
+        ``subtrahend`` subtracted (negative results are set to zero). This is equivalent
+        to ``copy_flow_rates_from(stream)`` followed by ``subtract_rates_from(subtrahend)``,
+        but writes the rates directly into the arrays backing ``self.components``: the
+        other phases are copied and the clipped difference is computed in a single pass,
+        without allocating new arrays or assigning DataFrame columns.
+
+        :param stream: (Stream) the stream to copy
+        :param subtrahend: (Stream) the source of the rates to subtract
+        :param phase: (str) the phase to subtract
+        :return: none
+        """
+        if stream.is_uninitialized():
+            raise OpgeeException(f"Can't copy from uninitialized stream: {stream}")
+
+        if subtrahend.is_uninitialized():
+            self.copy_flow_rates_from(stream)
+            return
+
+        ours = self.components
+        src = stream.components
+        units = ours[phase].dtype.units if isinstance(ours[phase].dtype, pint_pandas.PintType) else None
+
+        dst_arrays = [_float_magnitudes(ours[col], units) for col in ours.columns]
+        src_arrays = [_float_magnitudes(src[col], units) for col in ours.columns]
+        sub_array = _float_magnitudes(subtrahend.components[phase], units)
+        arrays = dst_arrays + src_arrays + [sub_array]
+
+        # Fall back to the general methods if units or layouts differ, or if our arrays
+        # overlap each other or the source streams' and so can't be overwritten.
+        if (units is None or list(src.columns) != list(ours.columns)
+                or not (ours.index.equals(src.index) and ours.index.equals(subtrahend.components.index))
+                or any(arr is None for arr in arrays)
+                or any(np.shares_memory(a, b) for a, b in combinations(dst_arrays, 2))
+                or any(np.shares_memory(dst, other) for dst in dst_arrays for other in src_arrays + [sub_array])):
+            self.copy_flow_rates_from(stream)
+            self.subtract_rates_from(subtrahend, phase=phase)
+            return
+
+        for col, dst, src_arr in zip(ours.columns, dst_arrays, src_arrays):
+            if col == phase:
+                _subtract_clipped(src_arr, sub_array, dst)
+            else:
+                np.copyto(dst, src_arr)
+
+        self.API = stream.API
+        self.electricity = stream.electricity
+        self.tp.copy_from(stream.tp)
+
+        self.initialized = True
 
     def add_combustion_CO2_from(self, stream):
         """
@@ -6,17 +6,24 @@
 # Copyright (c) 2021-2022 The Board of Trustees of the Leland Stanford Junior University.
 # See LICENSE.txt for license details.
 #
+import hashlib
 import os
+import pickle
 
 import pandas as pd
+import pint
 
+from .config import getParam
 from .core import OpgeeObject
 from .error import OpgeeException
 from .log import getLogger
 from .pkg_utils import resourceStream
+from .utils import code_signature
 
 _logger = getLogger(__name__)
 
+_TABLES_DIR = os.path.join(os.path.dirname(__file__), 'tables')
+
 
 class TableDef(object):
     """
@@ -74,10 +81,139 @@ class TableManager(OpgeeObject):
 
     _table_def_dict = {tbl_def.basename: tbl_def for tbl_def in table_defs}
 
+    # Built-in tables as read from CSV files (before applying user updates), shared by
+    # all instances so each table is parsed once per process. Keyed by table name.
+    _base_tables = {}
+
+    # Names of tables requested from any instance, to show which tables a workload uses
+    _accessed = set()
+
     def __init__(self, updates=None):
         self.table_dict = {}
         self.updates = updates
 
+    @classmethod
+    def clear(cls):
+        cls._base_tables.clear()
+        cls._accessed.clear()
+
+    @classmethod
+    def accessed_tables(cls):
+        """
+        Return the names of the tables requested via ``get_table`` by any instance
+        since the process started or ``TableManager.clear()`` was called.
+
+        :return: (list of str) the sorted table names
+        """
+        return sorted(cls._accessed)
+
+    @classmethod
+    def _read_base_table(cls, name, tbl_def):
+        """
+        Return the built-in table ``name`` as read from its CSV file, reading it
+        only if it hasn't already been read by this process. The returned
+        DataFrame is shared, so callers must copy it before modifying it.
+
+        :param name: (str) the name of a built-in table
+        :param tbl_def: (TableDef) the table's definition
+        :return: (pandas.DataFrame) the table data
+        """
+        df = cls._base_tables.get(name)
+        if df is not None:
+            return df
+
+        cache_path = cls._cache_path(name, tbl_def)
+        df = cls._read_cached_table(cache_path)
+        if df is not None:
+            cls._base_tables[name] = df
+            return df
+
+        relpath = f"tables/{name}.csv"
+        s = resourceStream(relpath, stream_type='text')
+        if tbl_def.has_units:
+            df = pd.read_csv(s, index_col=tbl_def.index_col, header=[0, 1])
+
+            unitful_cols = [name for name, unit in df.columns if unit != '_']
+            for col in unitful_cols:
+                df[col] = df[col].astype(float) # force numeric values to float to avoid complaints from pint
+
+            df_units = df[unitful_cols].pint.quantify(level=-1)
+            df[unitful_cols] = df_units[unitful_cols]
+            df.columns = df.columns.droplevel(1)        # drop the units from the column index
+        else:
+            df = pd.read_csv(s, index_col=tbl_def.index_col) if tbl_def.index_row is None \
+                else pd.read_csv(s, index_col=tbl_def.index_col, header=tbl_def.index_row)
+
+        if tbl_def.fillna is not None:
+            df.fillna(tbl_def.fillna, inplace=True)
+
+        cls._base_tables[name] = df
+        cls._write_cached_table(cache_path, df)
+        return df
+
+    @classmethod
+    def _cache_path(cls, name, tbl_def):
+        """
+        Return the pathname of the on-disk cache file for built-in table ``name``,
+        or None if caching is disabled (i.e., config variable "OPGEE.TableCacheDir"
+        is empty) or the table's CSV file isn't a plain file we can stat. The cache
+        file's name is a hash of the CSV file's pathname, size, and modification time,
+        the table's ``TableDef`` parameters, the opgee code signature (see
+        ``utils.code_signature()``), and the pandas and pint versions, so any of these
+        changing causes a cache miss. User updates are applied to a copy of the base
+        table, so they don't figure in the key.
+
+        :param name: (str) the name of a built-in table
+        :param tbl_def: (TableDef) the table's definition
+        :return: (str or None) the pathname of the cache file
+        """
+        cache_dir = getParam('OPGEE.TableCacheDir', raiseError=False)
+        if not cache_dir:
+            return None
+
+        csv_path = os.path.join(_TABLES_DIR, f"{name}.csv")
+        try:
+            st = os.stat(csv_path)
+        except OSError:
+            return None
+
+        tbl_params = (tbl_def.index_col, tbl_def.index_row, tbl_def.has_units, tbl_def.fillna)
+
+        key = (f"{csv_path}|{st.st_size}|{st.st_mtime_ns}|{tbl_params!r}|{code_signature()}|"
+               f"{pd.__version__}|{pint.__version__}")
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(cache_dir, f"{name}-{digest}.pkl")
+
+    @classmethod
+    def _read_cached_table(cls, cache_path):
+        if cache_path is None or not os.path.exists(cache_path):
+            return None
+
+        try:
+            return pd.read_pickle(cache_path)
+        except Exception as e:
+            _logger.debug(f"Ignoring unreadable table cache file '{cache_path}': {e}")
+            return None
+
+    @classmethod
+    def _write_cached_table(cls, cache_path, df):
+        if cache_path is None:
+            return
+
+        # Write to a temporary file and rename it so concurrent workers never
+        # see a partially written cache file.
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            df.to_pickle(tmp_path, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            _logger.debug(f"Failed to write table cache file '{cache_path}': {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
     def get_table(self, name, raiseError=True):
         """
         Retrieve a dataframe representing CSV data loaded by the TableManager
@@ -91,6 +227,7 @@ class TableManager(OpgeeObject):
 
         # load on demand, if a TableDef is found
         if df is None:
+            self._accessed.add(name)
             try:
                 tbl_def = self._table_def_dict[name]
             except KeyError:
@@ -99,24 +236,8 @@ class TableManager(OpgeeObject):
                 else:
                     return None
 
-            relpath = f"tables/{name}.csv"
-            s = resourceStream(relpath, stream_type='text')
-            if tbl_def.has_units:
-                df = pd.read_csv(s, index_col=tbl_def.index_col, header=[0, 1])
-
-                unitful_cols = [name for name, unit in df.columns if unit != '_']
-                for col in unitful_cols:
-                    df[col] = df[col].astype(float) # force numeric values to float to avoid complaints from pint
-
-                df_units = df[unitful_cols].pint.quantify(level=-1)
-                df[unitful_cols] = df_units[unitful_cols]
-                df.columns = df.columns.droplevel(1)        # drop the units from the column index
-            else:
-                df = pd.read_csv(s, index_col=tbl_def.index_col) if tbl_def.index_row is None \
-                    else pd.read_csv(s, index_col=tbl_def.index_col, header=tbl_def.index_row)
-
-            if tbl_def.fillna is not None:
-                df.fillna(tbl_def.fillna, inplace=True)
+            # Copy the shared table so updates and changes by callers don't affect other instances
+            df = self._read_base_table(name, tbl_def).copy()
 
             # apply XML table updates from user
             update = self.updates and self.updates.get(name)
@@ -8,12 +8,14 @@
    See the https://opensource.org/licenses/MIT for license details.
 '''
 import argparse
+import hashlib
 import os
 import sys
 
 from .config import unixPath
 from .error import OpgeeException
 from .log import getLogger
+from .version import VERSION
 
 _logger = getLogger(__name__)
 
@@ -317,3 +319,32 @@ def dequantify_dataframe(df):
 
     new_df = pd.DataFrame(items)
     return new_df
+
+
+_code_signature = None
+
+def code_signature():
+    """
+    Return a string identifying the running opgee code: the opgee and Python versions
+    and a hash of the size and modification time of each of opgee's Python source
+    files. It's stored with files cached on disk (e.g., pickled models and tables) so
+    that files written by different code are ignored rather than loaded.
+
+    :return: (str) the code signature
+    """
+    global _code_signature
+
+    if _code_signature is None:
+        pkg_dir = os.path.dirname(os.path.abspath(__file__))
+        h = hashlib.sha1()
+        for dirpath, dirnames, filenames in os.walk(pkg_dir):
+            dirnames[:] = sorted(d for d in dirnames if d != '__pycache__')
+            for filename in sorted(filenames):
+                if filename.endswith('.py'):
+                    st = os.stat(os.path.join(dirpath, filename))
+                    relpath = os.path.relpath(os.path.join(dirpath, filename), pkg_dir)
+                    h.update(f"{relpath}|{st.st_size}|{st.st_mtime_ns}\n".encode('utf-8'))
+
+        _code_signature = f"opgee {VERSION}; python {sys.version_info[0]}.{sys.version_info[1]}; {h.hexdigest()}"
+
+    return _code_signature
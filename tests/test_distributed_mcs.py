@@ -2,6 +2,8 @@ import re
 from opgee.mcs.distributed_mcs_dask import RemoteError, FieldResult
 from .utils_for_tests import tmpdir
 
+_FIELD_RESULT_PAT = re.compile(r'<FieldResult (\d+) trials of (\S+) in .*; task_count:0 error:.*>')
+
 # def test_dist_mcs():
 #     sim_dir = tmpdir('test-sim')
 #     mgr = Manager()
@@ -14,6 +16,11 @@ def test_remote_error():
     s = str(e)
     assert s ==  f"<RemoteError field='{field_name}' msg='{err_msg}'>"
 
+def test_remote_error_pickle():
+    import pickle
+    e = pickle.loads(pickle.dumps(RemoteError("Short message", 'field_1', trial=7)))
+    assert (e.msg, e.field_name, e.trial) == ("Short message", 'field_1', 7)
+
 def test_field_result():
     field_name = 'field_10'
     duration = 10.6
@@ -23,7 +30,7 @@ def test_field_result():
     res = FieldResult(field_name, duration, completed, error=e)
 
     s = str(res)
-    pat = f'<FieldResult {completed} trials of {field_name} in .*; task_count:0 error:.*>'
-    assert re.match(pat, s) is not None
+    m = _FIELD_RESULT_PAT.match(s)
+    assert m is not None and m.group(1) == str(completed) and m.group(2) == field_name
 
     assert res.duration == duration and res.field_name == field_name and res.error == e
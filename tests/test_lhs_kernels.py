@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from scipy import stats
+
+pytest.importorskip('numba')
+
+from opgee.mcs._lhs_kernels import ppf_kernel
+
+# Percentiles spanning the body and both tails of each distribution
+_q = np.concatenate([[0.0, 1e-300, 1e-100, 1e-12, 1e-6],
+                     np.linspace(0.001, 0.999, 999),
+                     [1 - 1e-6, 1 - 1e-12, 1.0]])
+
+def _check(dist_name, expected, rtol=1e-12, **params):
+    actual = ppf_kernel(dist_name)(_q, **params)
+    np.testing.assert_allclose(actual, expected, rtol=rtol, atol=1e-12)
+
+@pytest.mark.parametrize("loc,scale", [(0.0, 1.0), (100.0, 30.0), (-5.0, 0.01)])
+def test_norm_kernel(loc, scale):
+    _check('norm', stats.norm.ppf(_q, loc=loc, scale=scale), loc=loc, scale=scale)
+
+# scipy's truncnorm tails vary in accuracy between versions, so the tails are
+# checked against values computed with mpmath (60 digits), with loc=10, scale=2.
+_truncnorm_tail_q = np.array([1e-300, 1e-100, 1e-12, 1e-6, 0.5, 1 - 1e-6, 1 - 1e-12])
+_truncnorm_tail_ref = [
+    ((-2.0, 2.0), [6.0, 6.0, 6.0000000000353575, 6.000035357131895, 10.0, 13.999964642868104, 13.999999999964643]),
+    ((-1.0, 8.0), [8.0, 8.0, 8.000000000006954, 8.000006954091534, 10.40034737233378, 19.57643565378544, 24.116867662118246]),
+    ((0.5, 3.0), [11.0, 11.0, 11.000000000001744, 11.00000174506084, 12.030916506811966, 15.999861387088016, 15.999999999861375]),
+    ((5.0, 9.0), [20.0, 20.0, 20.000000000000387, 20.000000385616396, 20.264036664088447, 24.413370379540904, 27.720316840749774]),
+    ((6.0, 10.0), [22.0, 22.0, 22.000000000000323, 22.00000032475548, 22.223130123626877, 25.886039477146753, 29.01126376625273]),
+    ((-10.0, -6.0), [-10.0, -10.0, -9.011259196936944, -5.886039477153885, -2.223130123626876, -2.00000032475548, -2.0000000000003246]),
+    ((-np.inf, 1.0), [-64.10351140435169, -32.56310965188489, -4.117066975824769, 0.4235643459061819, 9.599652627666218, 11.999993045908466, 11.999999999993046]),
+    ((2.0, np.inf), [14.0, 14.0, 14.000000000000842, 14.000000842738814, 14.555209677618917, 20.936108497679975, 25.08844567609726]),
+]
+
+@pytest.mark.parametrize("a,b", [(-2.0, 2.0), (-1.0, 8.0), (0.5, 3.0), (5.0, 9.0), (6.0, 10.0),
+                                 (-10.0, -6.0), (-np.inf, 1.0), (2.0, np.inf), (40.0, 50.0)])
+def test_truncnorm_kernel(a, b):
+    params = dict(a=a, b=b, loc=10.0, scale=2.0)
+    body_q = np.linspace(0.001, 0.999, 999)
+    actual = ppf_kernel('truncnorm')(body_q, **params)
+    np.testing.assert_allclose(actual, stats.truncnorm.ppf(body_q, **params), rtol=1e-9)
+
+@pytest.mark.parametrize("bounds,expected", _truncnorm_tail_ref)
+def test_truncnorm_kernel_tails(bounds, expected):
+    a, b = bounds
+    actual = ppf_kernel('truncnorm')(_truncnorm_tail_q, a=a, b=b, loc=10.0, scale=2.0)
+    np.testing.assert_allclose(actual, expected, rtol=1e-12)
+
+@pytest.mark.parametrize("s,scale", [(0.5, 1.0), (1.5, np.exp(2.0)), (0.01, 100.0)])
+def test_lognorm_kernel(s, scale):
+    _check('lognorm', stats.lognorm.ppf(_q, s, scale=scale), s=s, scale=scale)
+
+def test_truncated_lognormal_kernel():
+    s, scale, low, high = 0.8, np.exp(1.0), 1.0, 10.0
+    expected = np.clip(stats.lognorm.ppf(_q, s, scale=scale), low, high)
+    _check('truncated_lognormal', expected, s=s, scale=scale, low=low, high=high)
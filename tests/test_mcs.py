@@ -19,7 +19,7 @@ header = "variable_name,distribution_type,mean,SD,low_bound,high_bound,prob_of_y
 def read_string_distros(data):
     """Read parameter distributions from a list of strings formatted as CSV data"""
     csv = StringIO(header + '\n'.join(data))
-    Distribution.instances.clear()              # empty the distros so we read new data without stale info
+    Distribution.clear()                        # empty the distros so we read new data without stale info
     read_distributions(pathname=csv)
 
 def test_good_distros():
@@ -93,8 +93,97 @@ def test_load_simulation():
     with pytest.raises(McsUserError, match="Simulation directory '.*' does not exist."):
         Simulation("/no/such/directory")
 
+def test_model_pickle_signature():
+    import pickle
+    from opgee.mcs.simulation import code_signature
+
+    sim = Simulation(sim_dir, field_names=[field_name])
+    path = sim.model_pickle_path()
+
+    with open(path, 'rb') as f:
+        assert pickle.load(f) == code_signature()
+        data = f.read()
+
+    assert sim._load_model_pickle()
+
+    # A pickle written by other code is ignored, so the model is rebuilt from XML
+    with open(path, 'wb') as f:
+        pickle.dump("opgee 0.0; python 0.0; stale", f)
+        f.write(data)
+
+    assert not sim._load_model_pickle()
+
+def test_attr_map():
+    import pandas as pd
+
+    sim = Simulation(sim_dir, field_names=[field_name])
+    field = sim.analysis.get_field(field_name)
+    names = pd.read_csv(sim.trial_data_path(field), index_col='trial_num', nrows=0).columns.tolist()
+
+    # Maps for the trial data columns are built before any trial runs
+    assert (field_name, tuple(names)) in sim._attr_maps
+
+    # Different parameter names must not reuse another map
+    subset = sim.attr_map(field, names[:1])
+    assert list(subset) == names[:1]
+    assert list(sim.attr_map(field, names)) == names
+
+def test_missing_trial_data():
+    import csv
+
+    read_distributions(pathname=None)
+    sim = Simulation.new(tmpdir('test-mcs-missing-data'), model_file, analysis_name, trials,
+                         overwrite=True, field_names=[field_name])
+
+    field = sim.analysis.get_field(field_name)
+    paths = sim.field_paths(field)
+    Path(paths['trial_data']).unlink()
+
+    assert sim.run_field(field, trial_nums=[0, 1], num_workers=1) == 0
+    assert Path(paths['results']).exists()
+
+    with open(paths['failures'], newline='') as f:
+        rows = list(csv.DictReader(f))
+
+    assert [int(row['trial_num']) for row in rows] == [0, 1]
+    assert all("Can't read trial data" in row['message'] for row in rows)
+
+def test_parallel_run_field():
+    import pandas as pd
+
+    read_distributions(pathname=None)
+    sim = Simulation.new(tmpdir('test-mcs-parallel'), model_file, analysis_name, trials,
+                         overwrite=True, field_names=[field_name])
+
+    field = sim.analysis.get_field(field_name)
+    results_csv = sim.field_paths(field)['results']
+    trial_nums = list(range(8))
+
+    serial = sim.run_field(field, trial_nums=trial_nums, num_workers=1)
+    serial_df = pd.read_csv(results_csv)
+
+    parallel = sim.run_field(field, trial_nums=trial_nums, num_workers=2)
+    parallel_df = pd.read_csv(results_csv).sort_values('trial_num').reset_index(drop=True)
+
+    assert parallel == serial > 0
+    pd.testing.assert_frame_equal(parallel_df, serial_df.sort_values('trial_num').reset_index(drop=True))
+
+def test_lhs_reproducible():
+    import numpy as np
+    from scipy import stats
+    from opgee.mcs.LHS import lhs
+
+    params = [stats.norm(10, 2), stats.uniform(0, 5)]
+
+    np.random.seed(42)
+    first = lhs(params, 20)
+    np.random.seed(42)
+    assert np.array_equal(first, lhs(params, 20))
+
+    assert np.array_equal(lhs(params, 20, seed=7), lhs(params, 20, seed=7))
+
 def test_distribution():
-    Distribution.instances.clear()
+    Distribution.clear()
 
     with pytest.raises(McsUserError, match="attribute name format is.*"):
         Distribution("foo.bar.baz", None)
@@ -60,3 +60,71 @@ def test_const(test_model2):
 
 def test_model_children(test_model2):
     assert set(test_model2.children()) == set(test_model2.analyses())
+
+
+@pytest.fixture(scope="module")
+def example_run(configure_logging_for_tests):
+    from opgee.model_file import ModelFile
+
+    model = ModelFile(None, use_default_model=True).model
+    analysis = model.get_analysis('example')
+    field = analysis.get_field('gas_lifting_field')
+    field.run(analysis)
+    return model, analysis, field
+
+
+def _baseline_comparison(field, analysis):
+    # Per-process totals computed as save_for_comparison originally did, with pint sums
+    import pandas as pd
+    from opgee.core import magnitude
+
+    procs = field.processes()
+    energy = pd.Series({p.name: magnitude(p.energy.rates().sum()) for p in procs}, name=field.name)
+    ghgs = pd.Series({p.name: magnitude(p.emissions.rates(analysis.gwp).loc["GHG"].sum()) for p in procs},
+                     name=field.name)
+
+    def _frame(s):
+        df = pd.concat([s], axis='columns')
+        df.index.name = 'process'
+        return df.sort_index(axis='rows')
+
+    return _frame(energy), _frame(ghgs)
+
+
+def test_save_for_comparison(example_run, tmp_path, monkeypatch):
+    import numpy as np
+    import pandas as pd
+    from opgee import ureg
+    from opgee.energy import EN_DIESEL
+
+    model, analysis, field = example_run
+
+    # NaN rates must be skipped in the totals, as in the original pint sums
+    proc = field.processes()[0]
+    proc.energy.set_rate(EN_DIESEL, ureg.Quantity(np.nan, "mmbtu/day"))
+
+    monkeypatch.chdir(tmp_path)
+    model.save_for_comparison([(field, analysis)], 'cmp.csv')
+
+    expected_energy, expected_ghgs = _baseline_comparison(field, analysis)
+    energy = pd.read_csv(tmp_path / 'energy-cmp.csv', index_col='process')
+    ghgs = pd.read_csv(tmp_path / 'emissions-cmp.csv', index_col='process')
+
+    assert not energy[field.name].isna().any()
+    pd.testing.assert_frame_equal(energy, expected_energy, check_exact=False, rtol=1e-12)
+    pd.testing.assert_frame_equal(ghgs, expected_ghgs, check_exact=False, rtol=1e-12)
+
+
+def test_save_for_comparison_format(example_run, tmp_path, monkeypatch):
+    import pandas as pd
+
+    model, analysis, field = example_run
+    monkeypatch.chdir(tmp_path)
+    model.save_for_comparison([(field, analysis)], 'cmp.csv')
+
+    # The files must be rendered exactly as pandas writes them (unquoted names, "0.0")
+    for prefix in ('energy-', 'emissions-'):
+        path = tmp_path / (prefix + 'cmp.csv')
+        text = path.read_text()
+        df = pd.read_csv(path, index_col='process', float_precision='round_trip')
+        assert text == df.to_csv(lineterminator='\n')
@@ -150,3 +150,35 @@ def test_electricity(stream_model):
 
     stream2.copy_electricity_rate_from(stream)
     assert stream2.electricity_flow_rate() == stream.electricity_flow_rate()
+
+def test_set_from_difference(stream_model):
+    from opgee.core import TemperaturePressure
+    from opgee.stream import Stream
+
+    tp = TemperaturePressure(100, 200)
+    src = Stream('src', tp)
+    src.set_gas_flow_rate('C1', ureg.Quantity(10.0, "tonne/day"))
+    src.set_gas_flow_rate('CO2', ureg.Quantity(2.0, "tonne/day"))
+
+    fugitives = Stream('fugitives', tp)
+    fugitives.set_gas_flow_rate('C1', ureg.Quantity(1.5, "tonne/day"))
+    fugitives.set_gas_flow_rate('CO2', ureg.Quantity(3.0, "tonne/day"))
+
+    fused = Stream('fused', tp)
+    fused.set_from_difference(src, fugitives)
+
+    expected = Stream('expected', tp)
+    expected.copy_flow_rates_from(src)
+    expected.subtract_rates_from(fugitives)
+
+    assert fused.gas_flow_rate('C1') == ureg.Quantity(8.5, "tonne/day")
+    assert fused.gas_flow_rate('CO2') == ureg.Quantity(0.0, "tonne/day")
+    assert fused.components.equals(expected.components)
+
+    # The result is written in place, so the source streams must be unchanged
+    assert src.gas_flow_rate('C1') == ureg.Quantity(10.0, "tonne/day")
+    assert fugitives.gas_flow_rate('C1') == ureg.Quantity(1.5, "tonne/day")
+
+    # Repeating the operation on an already-populated stream gives the same result
+    fused.set_from_difference(src, fugitives)
+    assert fused.components.equals(expected.components)
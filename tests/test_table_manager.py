@@ -20,3 +20,37 @@ def test_bad_table_name():
     name = 'non-existent-table'
     with pytest.raises(OpgeeException, match=f"Unknown table '{name}'"):
         mgr.get_table(name)
+
+def test_table_cache(tmp_path):
+    from opgee.config import getParam, setParam
+
+    saved = getParam('OPGEE.TableCacheDir')
+    setParam('OPGEE.TableCacheDir', str(tmp_path))
+    try:
+        TableManager.clear()
+        parsed = TableManager().get_table('process-specific-EF')
+        assert len(list(tmp_path.glob('process-specific-EF-*.pkl'))) == 1
+
+        TableManager.clear()
+        cached = TableManager().get_table('process-specific-EF')
+        assert cached.equals(parsed)
+    finally:
+        setParam('OPGEE.TableCacheDir', saved)
+        TableManager.clear()
+
+def test_table_cache_key(tmp_path):
+    from opgee.config import getParam, setParam
+    from opgee.table_manager import TableDef
+
+    saved = getParam('OPGEE.TableCacheDir')
+    setParam('OPGEE.TableCacheDir', str(tmp_path))
+    try:
+        name = 'process-specific-EF'
+        tbl_def = TableManager._table_def_dict[name]
+        changed = TableDef(name, index_col=tbl_def.index_col, has_units=tbl_def.has_units, fillna=0.0)
+
+        # Changing how a table is parsed must not reuse the cached table
+        assert TableManager._cache_path(name, tbl_def) == TableManager._cache_path(name, tbl_def)
+        assert TableManager._cache_path(name, tbl_def) != TableManager._cache_path(name, changed)
+    finally:
+        setParam('OPGEE.TableCacheDir', saved)